@@ -1,4 +1,5 @@
 import logging
+import math
 from discord.ext import commands
 
 from components.bot import Bot
@@ -35,6 +36,17 @@ class Default(commands.Cog):
         await self.bot.reload_extension(f"cogs.{cog}")
         await ctx.reply(f"Reloaded cog: {cog}")
 
+    @commands.command(name="latency", description="Show each shard's latency")
+    @is_authorized()
+    async def latency(self, ctx: commands.Context):
+        lines = [
+            f"shard {shard_id}: "
+            + (f"{latency * 1000:.0f}ms" if math.isfinite(latency) else "not connected")
+            for shard_id, latency in self.bot.shard_latencies()
+        ]
+
+        await ctx.reply("\n".join(lines))
+
     @commands.command(name="kill", description="Put the bot to sleep")
     @is_authorized()
     async def kill(self, ctx: commands.Context):
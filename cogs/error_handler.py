@@ -18,10 +18,13 @@ class ErrorHandler(commands.Cog):
             "An error has occurred, please contact the bot owner.", ephemeral=True
         )
 
-    @staticmethod
     async def on_error(
-        interaction: discord.Interaction, error: app_commands.AppCommandError
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ) -> None:
+        self.bot.metrics.command_errors.inc(
+            error=type(getattr(error, "original", error)).__name__
+        )
+
         if interaction.response.is_done():  # noqa
             await interaction.followup.send(
                 f"An error occurred: {error}", ephemeral=True
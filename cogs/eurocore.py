@@ -1,19 +1,34 @@
+import asyncio
 import discord
+import functools
 import logging
-import requests
-import os
+import re
+import time
 
 from discord import app_commands, Interaction
 from discord.ext import commands, tasks
 from discord.ui import Modal, Select, View
-from typing import Optional, Literal, Any
+from typing import List, Optional, Literal, Any
 
 from components.bot import Bot
+from components.bulk import read_bulk_dispatches
 from components.exceptions import NotLoggedIn
+from components.jobs import Job, JobGroup
+from components.poller import JobPoller
+from components.uploads import attachment_body, attachment_text
 from components.user import User
 
 logger = logging.getLogger("r4n")
 
+DISPATCH_CATEGORIES = {
+    "305": "Bulletin: Policy",
+    "315": "Bulletin: News",
+    "325": "Bulletin: Opinion",
+    "385": "Bulletin: Campaign",
+    "835": "Meta: Gameplay",
+    "845": "Meta: Reference",
+}
+
 
 class RegistrationModal(Modal, title="register for eurocore"):
     def __init__(self, bot: Bot):
@@ -103,22 +118,18 @@ class ChangePasswordModal(Modal, title="change your password"):
     )
 
     async def on_submit(self, interaction: Interaction, /) -> None:
-        headers = {"Authorization": f"Bearer {self.user.token}"}
-
         data = {"new_password": self.password.value}
 
-        async with self.bot.client.request(
-            "PATCH",
-            url=f"{self.bot.config.eurocore_url}/users/me/password",
-            headers=headers,
-            json=data,
+        async with self.bot.request(
+            self.user, "PATCH", "/users/me/password", json=data
         ) as response:
             if response.status != 200:
                 raise commands.UserInputError(await response.text())
-            else:
-                await interaction.response.send_message(
-                    "password changed", ephemeral=True
-                )
+
+        self.user.password = self.password.value
+        await self.bot.save_session(self.user)
+
+        await interaction.response.send_message("password changed", ephemeral=True)
 
     async def on_error(
         self, interaction: discord.Interaction, error: Exception
@@ -146,23 +157,15 @@ class ChangeUserPasswordModal(Modal, title="[ADMIN] change a user's password"):
     )
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        async with self.bot.client.request(
-            "GET",
-            url=f"{self.bot.config.eurocore_url}/users/username/{self.username.value}",
-        ) as response:
-            response_data = await response.json(encoding="UTF-8")
+        user_id = await self.bot.resolve_username(self.user, self.username.value)
 
-        headers = {"Authorization": f"Bearer {self.user.token}"}
+        if user_id is None:
+            raise commands.UserInputError("user not found")
 
         data = {"new_password": self.password.value}
 
-        user_id = int(response_data["id"])
-
-        async with self.bot.client.request(
-            "PATCH",
-            f"{self.bot.config.eurocore_url}/users/{user_id}/password",
-            headers=headers,
-            json=data,
+        async with self.bot.request(
+            self.user, "PATCH", f"/users/{user_id}/password", json=data
         ) as response:
             if response.status != 200:
                 raise commands.UserInputError("user not found")
@@ -183,10 +186,16 @@ class ChangeUserPasswordModal(Modal, title="[ADMIN] change a user's password"):
 
 class PermissionSelect(Select):
     def __init__(
-        self, bot: Bot, user: User, user_id: int, action: Literal["grant", "deny"]
+        self,
+        bot: Bot,
+        user: User,
+        username: str,
+        user_id: int,
+        action: Literal["grant", "deny"],
     ):
         self._bot = bot
         self._user = user
+        self._username = username
         self._user_id = user_id
         self._action = action
 
@@ -219,12 +228,10 @@ class PermissionSelect(Select):
         else:
             method = "DELETE"
 
-        headers = {"Authorization": f"Bearer {self._user.token}"}
-
-        async with self._bot.client.request(
-            method=method,
-            url=f"{self._bot.config.eurocore_url}/users/{self._user_id}/permissions",
-            headers=headers,
+        async with self._bot.request(
+            self._user,
+            method,
+            f"/users/{self._user_id}/permissions",
             json={"permissions": self.values},
         ) as response:
             if response.status != 204:
@@ -232,6 +239,9 @@ class PermissionSelect(Select):
                     f"unable to modify permissions for user with id: {self._user_id}"
                 )
 
+            # cached templates were read with the old permissions
+            self._bot.templates.evict(lambda key: key[0] == self._username.lower())
+
             await interaction.response.send_message(
                 content="permissions updated", ephemeral=True
             )
@@ -242,11 +252,16 @@ class PermissionSelect(Select):
 
 class SelectView(View):
     def __init__(
-        self, bot: Bot, user: User, user_id: int, action: Literal["grant", "deny"]
+        self,
+        bot: Bot,
+        user: User,
+        username: str,
+        user_id: int,
+        action: Literal["grant", "deny"],
     ):
         super().__init__()
 
-        self._select = PermissionSelect(bot, user, user_id, action)
+        self._select = PermissionSelect(bot, user, username, user_id, action)
         self.add_item(self._select)
 
     async def on_timeout(self) -> None:
@@ -312,8 +327,6 @@ class CreateOrUpdateTemplateModal(Modal, title="create or modify a telegram temp
         secret_key = self.secret_key.value
         description = self.description.value
 
-        headers = {"Authorization": f"Bearer {self.user.token}"}
-
         data = {
             "nation": nation,
             "tgid": tgid,
@@ -321,10 +334,10 @@ class CreateOrUpdateTemplateModal(Modal, title="create or modify a telegram temp
             "description": description,
         }
 
-        async with self.bot.client.request(
-            method=self.method,
-            url=f"{self.bot.config.eurocore_url}/templates{f'/{self.template_id}' if self.template_id else ''}",
-            headers=headers,
+        async with self.bot.request(
+            self.user,
+            self.method,
+            f"/templates{f'/{self.template_id}' if self.template_id else ''}",
             json=data,
         ) as response:
             if response.status not in [200, 201]:
@@ -336,6 +349,14 @@ class CreateOrUpdateTemplateModal(Modal, title="create or modify a telegram temp
             else:
                 response_data = await response.json()
 
+                template_id = str(response_data["id"])
+
+                # other users may have the old version cached
+                self.bot.templates.evict(lambda key: key[1] == template_id)
+                self.bot.templates.put(
+                    (self.user.name.lower(), template_id), response_data
+                )
+
                 await interaction.response.send_message(
                     embed=create_template_embed(response_data), ephemeral=True
                 )
@@ -350,12 +371,39 @@ class CreateOrUpdateTemplateModal(Modal, title="create or modify a telegram temp
         )
 
 
-class AddDispatchModal(Modal):
-    def __init__(self, user: User, bot: Bot):
+class SubmissionModal(Modal):
+    """Modal that submits jobs, deferring before attachments are read"""
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: Exception
+    ) -> None:
+        logger.error(f"submission error ({type(error)}): {error}")
+
+        message = f"submission failed: {error}"
+
+        # attachments are read after deferring, replace the thinking indicator
+        if interaction.response.is_done():
+            await interaction.edit_original_response(content=message)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+
+
+def nation_options(nations: List[str]) -> List[discord.SelectOption]:
+    return [
+        discord.SelectOption(label=nation.replace("_", " ").title(), value=nation)
+        for nation in nations
+    ]
+
+
+class AddDispatchModal(SubmissionModal):
+    def __init__(self, user: User, bot: Bot, nations: List[str]):
         self._user = user
         self._bot = bot
         super().__init__(title="Publish a Dispatch")
 
+        assert isinstance(self.dispatch_nation.component, discord.ui.Select)
+        self.dispatch_nation.component.options = nation_options(nations)
+
     dispatch_title = discord.ui.Label(
         text="Title",
         component=discord.ui.TextInput(
@@ -367,12 +415,6 @@ class AddDispatchModal(Modal):
         text="Nation",
         component=discord.ui.Select(
             placeholder="Select a nation",
-            options=[
-                discord.SelectOption(label=val.replace("_", " ").title(), value=val)
-                for val in requests.head(f"{os.getenv('EUROCORE_URL')}/dispatches")
-                .headers["dispatch-nations"]
-                .split(",")
-            ],
         ),
     )
 
@@ -381,12 +423,8 @@ class AddDispatchModal(Modal):
         component=discord.ui.Select(
             placeholder="Select a category",
             options=[
-                discord.SelectOption(label="Bulletin: Policy", value="305"),
-                discord.SelectOption(label="Bulletin: News", value="315"),
-                discord.SelectOption(label="Bulletin: Opinion", value="325"),
-                discord.SelectOption(label="Bulletin: Campaign", value="385"),
-                discord.SelectOption(label="Meta: Gameplay", value="835"),
-                discord.SelectOption(label="Meta: Reference", value="845"),
+                discord.SelectOption(label=label, value=value)
+                for value, label in DISPATCH_CATEGORIES.items()
             ],
         ),
     )
@@ -413,22 +451,25 @@ class AddDispatchModal(Modal):
         if not file.content_type or "text/plain" not in file.content_type:
             raise commands.UserInputError("content_type must be text/plain")
 
-        text: str = (await file.read()).decode("UTF-8")
-
         data = {
             "title": title,
             "nation": nation,
             "category": int(category[:1]),
             "subcategory": int(category),
-            "text": text,
         }
 
+        body = attachment_body(
+            self._bot.client, file, data, "text", self._bot.config.requests.upload_limit
+        )
+
+        await interaction.response.defer(thinking=True)
+
         await self._bot.publish_dispatch(
-            interaction, self._user, "POST", "/dispatches", data, ping
+            interaction, self._user, "POST", "/dispatches", ping=ping, body=body
         )
 
 
-class EditDispatchModal(Modal):
+class EditDispatchModal(SubmissionModal):
     def __init__(self, user: User, bot: Bot):
         self._user = user
         self._bot = bot
@@ -453,12 +494,8 @@ class EditDispatchModal(Modal):
         component=discord.ui.Select(
             placeholder="Select a category",
             options=[
-                discord.SelectOption(label="Bulletin: Policy", value="305"),
-                discord.SelectOption(label="Bulletin: News", value="315"),
-                discord.SelectOption(label="Bulletin: Opinion", value="325"),
-                discord.SelectOption(label="Bulletin: Campaign", value="385"),
-                discord.SelectOption(label="Meta: Gameplay", value="835"),
-                discord.SelectOption(label="Meta: Reference", value="845"),
+                discord.SelectOption(label=label, value=value)
+                for value, label in DISPATCH_CATEGORIES.items()
             ],
         ),
     )
@@ -485,36 +522,41 @@ class EditDispatchModal(Modal):
         if not file.content_type or "text/plain" not in file.content_type:
             raise commands.UserInputError("content_type must be text/plain")
 
-        text: str = (await file.read()).decode("UTF-8")
-
         data = {
             "title": title,
             "category": int(category[:1]),
             "subcategory": int(category),
-            "text": text,
         }
 
+        body = attachment_body(
+            self._bot.client, file, data, "text", self._bot.config.requests.upload_limit
+        )
+
+        await interaction.response.defer(thinking=True)
+
         await self._bot.publish_dispatch(
-            interaction, self._user, "PUT", f"/dispatches/{dispatch_id}", data, ping
+            interaction,
+            self._user,
+            "PUT",
+            f"/dispatches/{dispatch_id}",
+            ping=ping,
+            body=body,
         )
 
 
-class NewRMBPostModal(Modal):
-    def __init__(self, user: User, bot: Bot):
+class NewRMBPostModal(SubmissionModal):
+    def __init__(self, user: User, bot: Bot, nations: List[str]):
         self._user = user
         self._bot = bot
         super().__init__(title="Publish an RMB Post")
 
+        assert isinstance(self.nation.component, discord.ui.Select)
+        self.nation.component.options = nation_options(nations)
+
     nation = discord.ui.Label(
         text="Nation",
         component=discord.ui.Select(
             placeholder="Select a nation",
-            options=[
-                discord.SelectOption(label=val.replace("_", " ").title(), value=val)
-                for val in requests.head(f"{os.getenv('EUROCORE_URL')}/rmbposts")
-                .headers["rmbpost-nations"]
-                .split(",")
-            ],
         ),
     )
 
@@ -541,51 +583,165 @@ class NewRMBPostModal(Modal):
             # TODO: make this a custom error
             raise commands.UserInputError("content_type must be text/plain")
 
-        text = (await file.read()).decode("UTF-8")
+        data = {"nation": nation, "region": region}
+
+        body = attachment_body(
+            self._bot.client, file, data, "text", self._bot.config.requests.upload_limit
+        )
 
-        data = {"nation": nation, "region": region, "text": text}
+        await interaction.response.defer(thinking=True)
 
         await self._bot.publish_rmbpost(
             interaction,
             self._user,
             "POST",
             "/rmbposts",
-            data,
-            ping,
+            ping=ping,
+            body=body,
+        )
+
+
+class BroadcastRMBPostModal(SubmissionModal):
+    def __init__(self, user: User, bot: Bot, nations: List[str]):
+        self._user = user
+        self._bot = bot
+        super().__init__(title="Broadcast an RMB Post")
+
+        assert isinstance(self.nation.component, discord.ui.Select)
+        self.nation.component.options = nation_options(nations)
+
+    nation = discord.ui.Label(
+        text="Nation",
+        component=discord.ui.Select(
+            placeholder="Select a nation",
+        ),
+    )
+
+    regions = discord.ui.Label(
+        text="Regions",
+        description="one region per line or separated by commas",
+        component=discord.ui.TextInput(style=discord.TextStyle.paragraph),
+    )
+
+    content = discord.ui.Label(
+        text="Content", component=discord.ui.FileUpload(max_values=1, required=True)
+    )
+
+    ping = discord.ui.Label(text="Ping on Completion", component=discord.ui.Checkbox())
+
+    async def on_submit(self, interaction: Interaction) -> None:
+        assert isinstance(self.nation.component, discord.ui.Select)
+        assert isinstance(self.regions.component, discord.ui.TextInput)
+        assert isinstance(self.content.component, discord.ui.FileUpload)
+        assert isinstance(self.ping.component, discord.ui.Checkbox)
+
+        nation: str = self.nation.component.values[0]
+        file: discord.Attachment = self.content.component.values[0]
+        ping: bool = self.ping.component.value
+
+        regions = list(
+            dict.fromkeys(
+                region.strip().lower().replace(" ", "_")
+                for region in re.split(r"[,\n]", self.regions.component.value)
+                if region.strip()
+            )
+        )
+
+        if not regions:
+            raise commands.UserInputError("no regions given")
+
+        if len(regions) > self._bot.config.bulk.max_items:
+            raise commands.UserInputError(
+                f"at most {self._bot.config.bulk.max_items} regions can be posted to"
+            )
+
+        if file.content_type and "text/plain" not in file.content_type:
+            raise commands.UserInputError("content_type must be text/plain")
+
+        await interaction.response.defer(thinking=True)
+
+        # read once and shared by every submission, not streamed per region
+        text = await attachment_text(file, self._bot.config.requests.upload_limit)
+
+        group = JobGroup("RMB Broadcast", self._user, len(regions), ping)
+
+        await self._bot.publish_group(
+            interaction,
+            group,
+            {
+                region: functools.partial(
+                    self._bot.submit_rmbpost,
+                    self._user,
+                    "POST",
+                    "/rmbposts",
+                    {"nation": nation, "region": region, "text": text},
+                )
+                for region in regions
+            },
         )
 
 
 class Eurocore(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.poller = JobPoller(bot.eurocore, bot.config.polling)
 
     async def cog_load(self):
-        logger.info("loading eurocore, starting jobs task")
+        logger.info("loading eurocore, starting jobs, token and nation refresh tasks")
+        self.poll_jobs.change_interval(seconds=self.bot.config.polling.tick)
         self.poll_jobs.start()
+        self.refresh_tokens.change_interval(
+            seconds=self.bot.config.auth.refresh_interval
+        )
+        self.refresh_tokens.start()
+        self.refresh_nations.change_interval(
+            seconds=self.bot.config.caches.nations_interval
+        )
+        self.refresh_nations.start()
 
     async def cog_unload(self):
-        logger.info("unloading eurocore, stopping jobs task")
+        logger.info("unloading eurocore, stopping jobs, token and nation refresh tasks")
         self.poll_jobs.stop()
+        self.refresh_tokens.stop()
+        self.refresh_nations.stop()
 
-    @tasks.loop(seconds=10)
+    @tasks.loop(seconds=1)
     async def poll_jobs(self):
-        logger.debug("polling jobs")
-
-        for job in self.bot.jobs.values():
-            try:
-                await job.update(self.bot.client, self.bot.config.eurocore_url)
-            except:  # noqa: E722
-                logger.exception("unable to update job")
-
-            if job.status != "queued":
-                if job.ping_on_completion:
-                    await job.message.reply(f"<@!{job._user.id}>")
-
-        self.bot.jobs = {
-            message_id: job
-            for message_id, job in self.bot.jobs.items()
-            if job.status == "queued"
-        }
+        jobs = [
+            self.bot.jobs[job_id]
+            for job_id in self.bot.scheduler.due()
+            if job_id in self.bot.jobs
+        ]
+
+        if not jobs:
+            return
+
+        logger.debug("polling %d of %d jobs", len(jobs), len(self.bot.jobs))
+
+        start = time.monotonic()
+        handled = set()
+
+        try:
+            await self.poller.poll(jobs)
+
+            self.bot.metrics.poll_passes.observe(time.monotonic() - start)
+
+            logger.debug("skipped %d unchanged job edits so far", Job.skipped_edits)
+
+            for job in jobs:
+                if job.status != "queued":
+                    await self.bot.complete_job(job)
+                elif job.id in self.bot.jobs:
+                    self.bot.scheduler.reschedule(job.id)
+
+                handled.add(job.id)
+        finally:
+            # due jobs left the scheduler, put back any the pass did not handle
+            for job in jobs:
+                if job.id not in handled and job.id in self.bot.jobs:
+                    self.bot.scheduler.reschedule(job.id)
+
+        self.bot.flush_pings()
 
     @poll_jobs.before_loop
     async def before_poll_jobs(self):
@@ -595,8 +751,28 @@ class Eurocore(commands.Cog):
     async def on_poll_jobs_error(self, error):
         logger.error(f"polling jobs error: {error}")
 
+        self.bot.metrics.poll_errors.inc()
+
         self.poll_jobs.restart()
 
+    @tasks.loop(seconds=60)
+    async def refresh_tokens(self):
+        await self.bot.refresh_tokens()
+
+    @refresh_tokens.before_loop
+    async def before_refresh_tokens(self):
+        await self.bot.wait_until_ready()
+
+    @refresh_tokens.error
+    async def on_refresh_tokens_error(self, error):
+        logger.error(f"refreshing tokens error: {error}")
+
+        self.refresh_tokens.restart()
+
+    @tasks.loop(seconds=300)
+    async def refresh_nations(self):
+        await self.bot.nations.refresh_all()
+
     @app_commands.command(name="register", description="register for eurocore")
     async def register(self, interaction: discord.Interaction):
         await interaction.response.send_modal(RegistrationModal(self.bot))
@@ -617,7 +793,74 @@ class Eurocore(commands.Cog):
             await interaction.response.send_modal(LoginModal(self.bot))
             return
 
-        await interaction.response.send_modal(AddDispatchModal(user, self.bot))
+        nations = await self.bot.nations.get("dispatches")
+
+        if not nations:
+            raise commands.UserInputError("no nations can publish dispatches")
+
+        await interaction.response.send_modal(AddDispatchModal(user, self.bot, nations))
+
+    @dispatch_command_group.command(
+        name="bulk", description="post several dispatches from a zip archive"
+    )
+    @app_commands.describe(
+        archive="zip archive of the dispatches' text files",
+        manifest="CSV of file, title, nation and category, if not in the archive",
+        ping="ping when every dispatch has been published",
+    )
+    async def bulk_dispatch(
+        self,
+        interaction: discord.Interaction,
+        archive: discord.Attachment,
+        manifest: Optional[discord.Attachment] = None,
+        ping: bool = False,
+    ):
+        try:
+            user = await self.bot.get_eurocore_user(interaction)
+        except NotLoggedIn:
+            await interaction.response.send_modal(LoginModal(self.bot))
+            return
+
+        config = self.bot.config
+
+        if archive.size > config.bulk.archive_limit:
+            raise commands.UserInputError(
+                f"archive must be at most {config.bulk.archive_limit} bytes"
+            )
+
+        if manifest and manifest.size > config.requests.upload_limit:
+            raise commands.UserInputError(
+                f"manifest must be at most {config.requests.upload_limit} bytes"
+            )
+
+        await interaction.response.defer(thinking=True)
+
+        dispatches = await asyncio.to_thread(
+            read_bulk_dispatches,
+            await archive.read(),
+            await manifest.read() if manifest else None,
+            await self.bot.nations.get("dispatches"),
+            DISPATCH_CATEGORIES,
+            config.requests.upload_limit,
+            config.bulk.max_items,
+        )
+
+        group = JobGroup("Bulk Dispatches", user, len(dispatches), ping)
+
+        await self.bot.publish_group(
+            interaction,
+            group,
+            {
+                dispatch.file: functools.partial(
+                    self.bot.submit_dispatch,
+                    user,
+                    "POST",
+                    "/dispatches",
+                    dispatch.data(),
+                )
+                for dispatch in dispatches
+            },
+        )
 
     @dispatch_command_group.command(name="edit", description="edit a dispatch")
     async def edit_dispatch(self, interaction: discord.Interaction):
@@ -641,7 +884,31 @@ class Eurocore(commands.Cog):
             await interaction.response.send_modal(LoginModal(self.bot))
             return
 
-        await interaction.response.send_modal(NewRMBPostModal(user, self.bot))
+        nations = await self.bot.nations.get("rmbposts")
+
+        if not nations:
+            raise commands.UserInputError("no nations can publish RMB posts")
+
+        await interaction.response.send_modal(NewRMBPostModal(user, self.bot, nations))
+
+    @rmbpost_command_group.command(
+        name="broadcast", description="post an RMB message to several regions"
+    )
+    async def broadcast_rmbpost(self, interaction: discord.Interaction):
+        try:
+            user = await self.bot.get_eurocore_user(interaction)
+        except NotLoggedIn:
+            await interaction.response.send_modal(LoginModal(self.bot))
+            return
+
+        nations = await self.bot.nations.get("rmbposts")
+
+        if not nations:
+            raise commands.UserInputError("no nations can publish RMB posts")
+
+        await interaction.response.send_modal(
+            BroadcastRMBPostModal(user, self.bot, nations)
+        )
 
     user_command_group = app_commands.Group(
         name="user", description="eurocore user commands"
@@ -691,38 +958,29 @@ class Eurocore(commands.Cog):
             await interaction.response.send_modal(LoginModal(self.bot))
             return
 
-        headers = {"Authorization": f"Bearer {user.token}"}
+        user_id = await self.bot.resolve_username(user, username)
 
-        async with self.bot.client.request(
-            method="GET",
-            url=f"{self.bot.config.eurocore_url}/users/username/{username}",
-            headers=headers,
-        ) as response:
-            if response.status != 200:
-                raise commands.CommandError(f"unable to locate user: {username}")
-
-            data = await response.json(encoding="UTF-8")
+        if user_id is None:
+            raise commands.CommandError(f"unable to locate user: {username}")
 
-            user_id = data["id"]
+        view = SelectView(self.bot, user, username, user_id, action)
 
-            view = SelectView(self.bot, user, user_id, action)
-
-            if interaction.response.is_done():
-                message = await interaction.followup.send(
-                    "please select permissions to grant/deny",
-                    view=view,
-                    ephemeral=True,
-                )
-            else:
-                await interaction.response.send_message(
-                    "please select permissions to grant/deny",
-                    view=view,
-                    ephemeral=True,
-                )
+        if interaction.response.is_done():
+            message = await interaction.followup.send(
+                "please select permissions to grant/deny",
+                view=view,
+                ephemeral=True,
+            )
+        else:
+            await interaction.response.send_message(
+                "please select permissions to grant/deny",
+                view=view,
+                ephemeral=True,
+            )
 
-                message = await interaction.original_response()
+            message = await interaction.original_response()
 
-            view.set_message(message)
+        view.set_message(message)
 
     @perms_command_group.command(
         name="grant", description="grant permissions to a user"
@@ -748,24 +1006,30 @@ class Eurocore(commands.Cog):
             await interaction.response.send_modal(LoginModal(self.bot))
             return
 
-        headers = {"Authorization": f"Bearer {user.token}"}
+        # cached per eurocore user, so only users who could read it get it
+        key = (user.name.lower(), template)
 
-        async with self.bot.client.request(
-            method="GET",
-            url=f"{self.bot.config.eurocore_url}/templates/{template}",
-            headers=headers,
-        ) as response:
-            if response.status != 200:
-                raise commands.CommandError(f"cannot find template with id: {template}")
+        if (data := self.bot.templates.get(key)) is None:
+            async with self.bot.request(
+                user, "GET", f"/templates/{template}"
+            ) as response:
+                if response.status != 200:
+                    raise commands.CommandError(
+                        f"cannot find template with id: {template}"
+                    )
 
-            if interaction.response.is_done():
-                await interaction.followup.send(
-                    embed=create_template_embed(await response.json()), ephemeral=True
-                )
-            else:
-                await interaction.response.send_message(
-                    embed=create_template_embed(await response.json()), ephemeral=True
-                )
+                data = await response.json()
+
+            self.bot.templates.put(key, data)
+
+        if interaction.response.is_done():
+            await interaction.followup.send(
+                embed=create_template_embed(data), ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                embed=create_template_embed(data), ephemeral=True
+            )
 
     @template_command_group.command(
         name="create", description="create a new eurocore telegram template"
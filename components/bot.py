@@ -1,22 +1,58 @@
 import aiohttp
+import asyncio
 import discord
+import dataclasses
+import functools
 import logging
+import sqlite3
 import sys
+import time
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 from discord.ext import commands
-from typing import Dict, Optional
-
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from components.cache import MISSING, TTLCache
+from components.client import Body, EurocoreClient
 from components.config import Config
 from .exceptions import NotLoggedIn
-from components.jobs import Job, Dispatch, RMBPost
+from components.edits import EditScheduler
+from components.jobs import JOB_TYPES, Job, JobGroup, Dispatch, RMBPost
+from components.limiter import QueuedCallback, RateLimiter
+from components.metrics import BotMetrics, Counter, Gauge, MetricsServer
+from components.nations import NationCache
+from components.scheduler import JobScheduler
+from components.store import JobStore
 from components.user import User, UserList
 
+if TYPE_CHECKING:
+    from components.events import JobEventReceiver
+    from components.sessions import SessionStore
+
 logger = logging.getLogger("r4n")
 
+REFRESH_CONCURRENCY = 5
+PING_LENGTH = 1900
+
+T = TypeVar("T")
+
 
 class Bot(commands.Bot):
     _client: aiohttp.ClientSession
+    _eurocore: EurocoreClient
     _config: Config
     _users: UserList
 
@@ -25,6 +61,11 @@ class Bot(commands.Bot):
         """`aiohttp.ClientSession`"""
         return self._client
 
+    @property
+    def eurocore(self):
+        """`EurocoreClient`"""
+        return self._eurocore
+
     @property
     def config(self):
         """`Config`"""
@@ -40,62 +81,598 @@ class Bot(commands.Bot):
         """Eurocore jobs"""
         return self._jobs
 
-    @jobs.setter
-    def jobs(self, value: Dict[str, Job]):
-        self._jobs = value
+    @property
+    def scheduler(self):
+        """`JobScheduler`"""
+        return self._scheduler
+
+    @property
+    def editor(self):
+        """`EditScheduler`"""
+        return self._editor
+
+    @property
+    def metrics(self):
+        """`BotMetrics`"""
+        return self._metrics
+
+    @property
+    def nations(self):
+        """`NationCache`"""
+        return self._nations
+
+    @property
+    def templates(self):
+        """Telegram templates by eurocore username and template id"""
+        return self._templates
 
-    def __init__(self, config: Config, client: aiohttp.ClientSession):
+    def __init__(
+        self,
+        config: Config,
+        client: aiohttp.ClientSession,
+        started_at: Optional[float] = None,
+    ):
         intents = discord.Intents.default()
 
-        super().__init__(command_prefix=".", intents=intents)
+        options = {}
+
+        if isinstance(self, commands.AutoShardedBot):
+            options = {
+                "shard_count": config.sharding.count,
+                "shard_ids": config.sharding.ids,
+            }
+
+        super().__init__(command_prefix=".", intents=intents, **options)
 
         self._client = client
+        self._eurocore = EurocoreClient(client, config.eurocore_url, config.requests)
         self._config = config
+        self._started_at = time.monotonic() if started_at is None else started_at
         self._users = UserList()
+        self._nations = NationCache(self._eurocore, config.caches)
+        self._templates: TTLCache[Tuple[str, str], dict] = TTLCache(
+            config.caches.template_size, config.caches.template_ttl
+        )
+        self._user_ids: TTLCache[str, Optional[int]] = TTLCache(
+            config.caches.username_size, config.caches.username_ttl
+        )
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._editor = EditScheduler(config.edits)
+        self._limiters = {
+            Dispatch.kind: RateLimiter(
+                config.rate_limits.dispatch_rate / 60, config.rate_limits.dispatch_burst
+            ),
+            RMBPost.kind: RateLimiter(
+                config.rate_limits.rmbpost_rate / 60, config.rate_limits.rmbpost_burst
+            ),
+        }
         self._jobs: Dict[str, Job] = {}
+        self._pings: Dict[Tuple[int, int], List[Union[Job, JobGroup]]] = {}
+        self._ping_flush: Optional[asyncio.Task] = None
+        self._events: Optional["JobEventReceiver"] = None
+        self._lease_renewer: Optional[asyncio.Task] = None
+
+        self.startup_time: Optional[float] = None
+
+        if config.events.enabled:
+            # events deliver job updates, polling only catches missed ones
+            polling = dataclasses.replace(
+                config.polling,
+                initial_interval=config.events.reconcile_interval,
+                max_interval=config.events.reconcile_interval,
+            )
+
+            # aiohttp.web is only needed when receiving events
+            from components.events import JobEventReceiver
+
+            self._events = JobEventReceiver(config.events, self.handle_job_event)
+        else:
+            polling = config.polling
+
+        self._metrics = BotMetrics()
+        self._metrics_server: Optional[MetricsServer] = None
+
+        if config.metrics.enabled:
+            self._metrics_server = MetricsServer(config.metrics, self._metrics)
+
+        self._eurocore.add_hook(self._record_request)
+        self._editor.add_hook(self._record_edit)
+        self._register_gauges()
+
+        self._scheduler = JobScheduler(polling)
+        self._store = JobStore(config.database)
+        self._sessions: Optional["SessionStore"] = None
+
+        if config.database.session_key:
+            from components.sessions import SessionStore
+
+            self._sessions = SessionStore(config.database)
+
+    @property
+    def within_budget(self) -> bool:
+        """Whether startup finished within `Startup.budget`"""
+        budget = self._config.startup.budget
+
+        return self.startup_time is not None and (
+            budget is None or self.startup_time <= budget
+        )
 
     async def on_ready(self):
         logger.info(f"logged in as {self.user}")
 
+        if self.startup_time is not None:
+            return
+
+        self.startup_time = time.monotonic() - self._started_at
+
+        logger.info(f"ready in {self.startup_time:.2f}s")
+
+        if not self.within_budget:
+            logger.warning(
+                f"startup took {self.startup_time:.2f}s, "
+                f"over the {self._config.startup.budget:.2f}s budget"
+            )
+
+        if self._config.startup.benchmark:
+            await self.close()
+
+    def _record_request(
+        self, method: str, name: str, status: Optional[int], elapsed: float
+    ):
+        self._metrics.requests.observe(elapsed, endpoint=name)
+
+        if status is None or status >= 400:
+            self._metrics.request_errors.inc(endpoint=name)
+
+    def _record_edit(self, action: str, elapsed: float, success: bool):
+        self._metrics.edits.observe(elapsed, action=action)
+
+        if not success:
+            self._metrics.edit_errors.inc(action=action)
+
+    def _register_gauges(self):
+        """Metrics read from the bot's state when they are scraped"""
+
+        def queued_jobs() -> Dict[Tuple[str, ...], float]:
+            counts = {(kind,): 0.0 for kind in JOB_TYPES}
+
+            for job in self._jobs.values():
+                if job.status == "queued":
+                    counts[(job.kind,)] += 1
+
+            return counts
+
+        self._metrics.register(
+            Gauge("r4n_jobs_queued", "Queued jobs by type", ("kind",), queued_jobs)
+        )
+        self._metrics.register(
+            Gauge(
+                "r4n_submissions_waiting",
+                "Submissions waiting for their rate limit, by type",
+                ("kind",),
+                lambda: {
+                    (kind,): len(limiter) for kind, limiter in self._limiters.items()
+                },
+            )
+        )
+        self._metrics.register(
+            Gauge(
+                "r4n_edits_pending",
+                "Discord message edits waiting for their channel's budget",
+                collect=lambda: {(): len(self._editor)},
+            )
+        )
+        self._metrics.register(
+            Counter(
+                "r4n_edits_coalesced_total",
+                "Message edits collapsed into an edit that was already waiting",
+                collect=lambda: {(): self._editor.coalesced},
+            )
+        )
+        self._metrics.register(
+            Counter(
+                "r4n_edits_skipped_total",
+                "Message edits skipped because nothing visible changed",
+                collect=lambda: {(): Job.skipped_edits},
+            )
+        )
+
+    def shard_latencies(self) -> List[Tuple[int, float]]:
+        """Heartbeat latency in seconds of each shard run by this process"""
+        return [(self.shard_id or 0, self.latency)]
+
+    async def _restore(self):
+        await self._store.open()
+
+        if self._sessions:
+            await self._sessions.open()
+            await self.restore_sessions()
+
+        # jobs are restored after sessions, so they belong to signed in users
+        await self.restore_jobs()
+
+        self._lease_renewer = asyncio.create_task(self._renew_lease_periodically())
+
+    async def _renew_lease_periodically(self):
+        while True:
+            await asyncio.sleep(self._config.database.lease_renew_interval)
+
+            try:
+                await self.restore_jobs()
+            except sqlite3.Error:
+                logger.exception("unable to renew lease")
+
+    async def _load_cog(self, cog: str):
+        logger.info(f"loading cog: {cog}")
+
+        await self.load_extension(f"cogs.{cog}")
+
     async def setup_hook(self):
         default_cogs = ["default", "eurocore", "error_handler"]
 
-        for cog in default_cogs:
-            logger.info(f"loading cog: {cog}")
-            try:
-                await self.load_extension(f"cogs.{cog}")
-            except Exception:
-                logger.exception("failed to load cog: %s", cog)
+        # cogs do not depend on each other or on restored state, and the
+        # nation lists are warmed by the eurocore cog as it loads
+        results = await asyncio.gather(
+            self._restore(),
+            *(self._load_cog(cog) for cog in default_cogs),
+            return_exceptions=True,
+        )
+
+        for name, result in zip(["restore", *default_cogs], results):
+            if isinstance(result, Exception):
+                logger.error("failed to load: %s", name, exc_info=result)
                 sys.exit(1)
 
+        if self._events:
+            await self._events.start()
+
+        if self._metrics_server:
+            await self._metrics_server.start()
+
+    async def close(self):
+        if self._events:
+            await self._events.stop()
+
+        if self._metrics_server:
+            await self._metrics_server.stop()
+
+        if self._lease_renewer:
+            self._lease_renewer.cancel()
+            self._lease_renewer = None
+
+        # send held completion pings along with the final edits
+        if self._ping_flush:
+            self._ping_flush.cancel()
+            self._ping_flush = None
+
+        self.flush_pings()
+
+        await self._editor.stop()
+        await self._store.close()
+
+        if self._sessions:
+            await self._sessions.close()
+
+        await super().close()
+
+    def add_job(self, job: Job):
+        self._jobs[job.id] = job
+        self._scheduler.add(job.id)
+        self._store.save(job)
+
+    def remove_job(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._scheduler.remove(job_id)
+        self._store.delete(job_id)
+
+    async def restore_sessions(self):
+        """Log users back in with the sessions kept by a previous run"""
+        for user in await self._sessions.load():
+            # passwords are not kept, so expired sessions cannot be renewed
+            if not user.expired:
+                self._users.add_user(user.id, user)
+
+        logger.info("restored %d sessions", len(self._users))
+
+    async def save_session(self, user: User):
+        if not self._sessions:
+            return
+
+        try:
+            await self._sessions.save(user)
+        except Exception:
+            logger.exception("unable to save session: %s", user.name)
+
+    async def sign_out(self, user: User):
+        """Forget `user` and their stored session"""
+        # they may have logged in again since
+        if user.id not in self._users or self._users[user.id] is not user:
+            return
+
+        self._users.remove_user(user.id)
+
+        if not self._sessions:
+            return
+
+        try:
+            await self._sessions.delete(user.id)
+        except Exception:
+            logger.exception("unable to delete session: %s", user.name)
+
+    async def restore_jobs(self):
+        """Renew this instance's lease and track every job it owns
+
+        Resumes the jobs left queued by a previous run and the jobs taken
+        over from instances whose lease expired, and stops tracking jobs
+        another instance has taken over.
+        """
+        records, lost = await self._store.renew()
+
+        for job_id in lost:
+            if job_id in self._jobs:
+                logger.warning("job %s was taken over by another instance", job_id)
+
+                self._jobs.pop(job_id)
+                self._scheduler.remove(job_id)
+
+        restored = 0
+
+        for record in records:
+            if record["id"] in self._jobs:
+                continue
+
+            if record["kind"] not in JOB_TYPES:
+                logger.warning("unable to restore job: %s", record["id"])
+                continue
+
+            if record["user_id"] in self._users:
+                user = self._users[record["user_id"]]
+            else:
+                user = User(record["user_id"], record["user_name"], password="")
+
+            job = JOB_TYPES[record["kind"]].from_record(record, user)
+
+            if record["message_id"]:
+                channel = self.get_partial_messageable(
+                    record["channel_id"], guild_id=record["guild_id"]
+                )
+                job.set_message(
+                    channel.get_partial_message(record["message_id"]), self._editor
+                )
+
+            self._jobs[job.id] = job
+            self._scheduler.add(job.id)
+
+            restored += 1
+
+        if restored:
+            logger.info("restored %d jobs", restored)
+
+    async def complete_job(self, job: Job):
+        """Stop tracking a finished job and ping its user if requested"""
+        if job.id not in self._jobs:
+            return
+
+        self.remove_job(job.id)
+
+        if job.group:
+            if job.group.finished:
+                await self.complete_group(job.group)
+
+            return
+
+        if job.ping_on_completion and job.message:
+            self._queue_ping(job)
+
+    async def complete_group(self, group: JobGroup):
+        """Ping the group's user once all of its jobs have finished"""
+        if not group.complete() or not group.ping_on_completion:
+            return
+
+        self._queue_ping(group)
+
+    def _queue_ping(self, job: Union[Job, JobGroup]):
+        """Hold a completion ping until the current poll window ends
+
+        Pings are flushed at the end of each polling pass, completions
+        delivered by events are flushed after one polling tick instead.
+        """
+        key = (job.user.id, job.message.channel.id)
+        self._pings.setdefault(key, []).append(job)
+
+        if self._ping_flush is None or self._ping_flush.done():
+            self._ping_flush = asyncio.create_task(self._flush_pings_later())
+
+    async def _flush_pings_later(self):
+        await asyncio.sleep(self._config.polling.tick)
+
+        self.flush_pings()
+
+    def flush_pings(self):
+        """Send one completion notice per user and channel for held pings"""
+        pings, self._pings = self._pings, {}
+
+        for (user_id, channel_id), jobs in pings.items():
+            if len(jobs) == 1:
+                self._editor.reply(jobs[0].message, f"<@!{user_id}>")
+                continue
+
+            # partial messages restored at startup have no guild, so links
+            # are built from the cached channel when there is one
+            channel = self.get_channel(channel_id) or jobs[0].message.channel
+
+            content = f"<@!{user_id}> {len(jobs)} jobs finished:"
+
+            for i, job in enumerate(jobs):
+                url = channel.get_partial_message(job.message.id).jump_url
+                line = f"\n- [{job.label}]({url}): {job.status}"
+
+                if len(content) + len(line) > PING_LENGTH:
+                    content += f"\n- and {len(jobs) - i} more"
+                    break
+
+                content += line
+
+            self._editor.send(channel, content)
+
+    async def handle_job_event(self, kind: str, data: dict) -> bool:
+        job = self._jobs.get(f"{kind}-{data['id']}")
+
+        if not job:
+            return False
+
+        try:
+            job.apply(data)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"unable to apply status of job {job.id}: {e!r}") from e
+
+        await job.refresh()
+
+        if job.status != "queued":
+            await self.complete_job(job)
+
+        return True
+
+    async def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Await `factory()`, or the call already in flight for `key`
+
+        Every concurrent caller with the same key shares one call and its
+        result, cancelling a caller does not cancel the shared call.
+        """
+        task = self._in_flight.get(key)
+
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._in_flight[key] = task
+
+            def done(finished: asyncio.Task):
+                if self._in_flight.get(key) is finished:
+                    del self._in_flight[key]
+
+            task.add_done_callback(done)
+
+        return await asyncio.shield(task)
+
     async def register(self, discord_id: int, username: str, password: str) -> User:
-        async with self._client.post(
-            url=f"{self._config.eurocore_url}/register",
-            json={"username": username, "password": password},
-        ) as response:
-            data = await response.json(encoding="UTF-8")
+        return await self._single_flight(
+            ("register", discord_id, username, password),
+            lambda: self._register(discord_id, username, password),
+        )
 
-            user = self._users.add_user(
-                discord_id=discord_id,
-                user=User(
-                    id=discord_id, name=username, password=password, token=data["token"]
-                ),
-            )
+    async def _register(self, discord_id: int, username: str, password: str) -> User:
+        token = await self._eurocore.register(username, password)
+
+        user = self._users.add_user(
+            discord_id=discord_id,
+            user=User(id=discord_id, name=username, password=password, token=token),
+        )
 
-            user.last_login = datetime.now()
+        await self.save_session(user)
 
-            return user
+        return user
 
     async def sign_in(self, user: User):
-        async with self._client.post(
-            url=f"{self._config.eurocore_url}/login",
-            json={"username": user.name, "password": user.password},
-        ) as response:
-            data = await response.json(encoding="UTF-8")
+        token = await self._single_flight(
+            ("login", user.id, user.name, user.password),
+            lambda: self._eurocore.login(user.name, user.password),
+        )
+
+        user.add_token(token)
+
+        await self.save_session(user)
+
+    async def refresh_tokens(self):
+        """Sign users in again before their tokens expire"""
+        deadline = datetime.now() + timedelta(seconds=self._config.auth.refresh_margin)
+
+        users = [
+            self._users[discord_id]
+            for discord_id in self._users
+            if self._users[discord_id].expires_at <= deadline
+            # restored sessions have no password to sign in with
+            and self._users[discord_id].password
+        ]
+
+        if not users:
+            return
+
+        semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+
+        async def refresh(user: User):
+            async with semaphore:
+                try:
+                    await self.sign_in(user)
+                except aiohttp.ClientResponseError as e:
+                    if e.status == 401:
+                        # the password changed elsewhere, retrying would only
+                        # send the same failed login every refresh
+                        logger.warning("login rejected for %s, signing out", user.name)
+
+                        await self.sign_out(user)
+                    else:
+                        logger.warning(
+                            "unable to refresh token for %s: %s", user.name, e
+                        )
+
+                    self._metrics.logins.inc(reason="expiring", result="failure")
+                except Exception as e:
+                    logger.warning("unable to refresh token for %s: %s", user.name, e)
+
+                    self._metrics.logins.inc(reason="expiring", result="failure")
+                else:
+                    self._metrics.logins.inc(reason="expiring", result="success")
+
+        await asyncio.gather(*(refresh(user) for user in users))
+
+        logger.debug("refreshed %d tokens", len(users))
+
+    @asynccontextmanager
+    async def request(
+        self, user: User, method: str, resource: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Make an authenticated eurocore request on behalf of `user`
+
+        If eurocore rejects the user's token, they are signed in again and the
+        request is replayed once.
+        """
+        try:
+            response = await self._eurocore.send(
+                method, resource, token=user.token, **kwargs
+            )
+        except aiohttp.ClientResponseError as e:
+            if e.status != 401:
+                raise
+
+            if not user.password:
+                logger.info("token rejected for %s, signing out", user.name)
 
-            user.token = data["token"]
+                await self.sign_out(user)
+                raise
 
-            user.last_login = datetime.now()
+            logger.info("token rejected for %s, signing in again", user.name)
+
+            try:
+                await self.sign_in(user)
+            except Exception as e:
+                self._metrics.logins.inc(reason="rejected", result="failure")
+
+                if isinstance(e, aiohttp.ClientResponseError) and e.status == 401:
+                    logger.warning("login rejected for %s, signing out", user.name)
+
+                    await self.sign_out(user)
+
+                raise
+
+            self._metrics.logins.inc(reason="rejected", result="success")
+
+            response = await self._eurocore.send(
+                method, resource, token=user.token, **kwargs
+            )
+
+        async with response:
+            yield response
 
     async def get_eurocore_user(self, interaction: discord.Interaction) -> User:
         if interaction.user.id not in self._users:
@@ -103,35 +680,87 @@ class Bot(commands.Bot):
 
         user = self._users[interaction.user.id]
 
-        if datetime.now() - user.last_login > timedelta(hours=1):
-            await self.sign_in(user)
+        # tokens are normally renewed in the background before they expire
+        if user.expired:
+            if not user.password:
+                await self.sign_out(user)
+                raise NotLoggedIn(interaction.user.id)
+
+            try:
+                await self.sign_in(user)
+            except Exception:
+                self._metrics.logins.inc(reason="expired", result="failure")
+                raise
+
+            self._metrics.logins.inc(reason="expired", result="success")
 
         return user
 
-    async def publish_dispatch(
+    async def resolve_username(self, user: User, username: str) -> Optional[int]:
+        """eurocore id of `username`, or None if there is no such user
+
+        Ids are cached for `Caches.username_ttl` seconds and unknown
+        usernames for `Caches.username_negative_ttl` seconds.
+        """
+        user_id = self._user_ids.get(username, MISSING)
+
+        if user_id is not MISSING:
+            return user_id
+
+        return await self._single_flight(
+            ("username", user.id, username),
+            lambda: self._resolve_username(user, username),
+        )
+
+    async def _resolve_username(self, user: User, username: str) -> Optional[int]:
+        try:
+            async with self.request(
+                user, "GET", f"/users/username/{username}"
+            ) as response:
+                data = await response.json(encoding="UTF-8")
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                raise
+
+            self._user_ids.put(
+                username, None, ttl=self._config.caches.username_negative_ttl
+            )
+
+            return None
+
+        user_id = int(data["id"])
+
+        self._user_ids.put(username, user_id)
+
+        return user_id
+
+    async def submit_dispatch(
         self,
-        interaction: discord.Interaction,
         user: User,
         method: str,
         resource: str,
         data: Optional[dict] = None,
         ping: bool = False,
-    ):
-        headers = {"Authorization": f"Bearer {user.token}"}
+        body: Optional[Body] = None,
+        on_queued: Optional[QueuedCallback] = None,
+    ) -> Dispatch:
+        """Submit a dispatch job to eurocore
 
-        async with self._client.request(
-            method,
-            url=f"{self._config.eurocore_url}{resource}",
-            headers=headers,
-            json=data,
-        ) as response:
+        The request body is `data`, or streamed from `body` if given. Waits
+        for the dispatch rate limit first, calling `on_queued` if it has to.
+        """
+        await self._limiters[Dispatch.kind].acquire(user.id, on_queued)
+
+        content = {"body": body} if body else {"json": data}
+
+        async with self.request(user, method, resource, **content) as response:
             data = await response.json(encoding="UTF-8")
 
             if not data:
                 # TODO: make custom error
                 raise commands.CommandError("response is empty")
 
-            dispatch = Dispatch(
+            return Dispatch(
                 job_id=data["id"],
                 action=data["action"],
                 user=user,
@@ -147,40 +776,33 @@ class Bot(commands.Bot):
                 ping_on_completion=ping,
             )
 
-            if interaction.response.is_done():
-                message = await interaction.followup.send(embed=dispatch.embed())
-            else:
-                await interaction.response.send_message(embed=dispatch.embed())
-                message = await interaction.original_response()
-
-            dispatch.set_message(message)
-
-            self._jobs[dispatch.id] = dispatch
-
-    async def publish_rmbpost(
+    async def submit_rmbpost(
         self,
-        interaction: discord.Interaction,
         user: User,
         method: str,
         resource: str,
         data: Optional[dict] = None,
         ping: bool = False,
-    ):
-        headers = {"Authorization": f"Bearer {user.token}"}
+        body: Optional[Body] = None,
+        on_queued: Optional[QueuedCallback] = None,
+    ) -> RMBPost:
+        """Submit an RMB post job to eurocore
 
-        async with self._client.request(
-            method,
-            url=f"{self._config.eurocore_url}{resource}",
-            headers=headers,
-            json=data,
-        ) as response:
+        The request body is `data`, or streamed from `body` if given. Waits
+        for the RMB post rate limit first, calling `on_queued` if it has to.
+        """
+        await self._limiters[RMBPost.kind].acquire(user.id, on_queued)
+
+        content = {"body": body} if body else {"json": data}
+
+        async with self.request(user, method, resource, **content) as response:
             data = await response.json(encoding="UTF-8")
 
             if not data:
                 # TODO: make custom error
                 raise commands.CommandError("response is empty")
 
-            rmbpost = RMBPost(
+            return RMBPost(
                 job_id=data["id"],
                 user=user,
                 location=response.headers["Location"],
@@ -195,12 +817,142 @@ class Bot(commands.Bot):
                 ping_on_completion=ping,
             )
 
-            if interaction.response.is_done():
-                message = await interaction.followup.send(embed=rmbpost.embed())
-            else:
-                await interaction.response.send_message(embed=rmbpost.embed())
-                message = await interaction.original_response()
+    async def _send(
+        self, interaction: discord.Interaction, embed: discord.Embed
+    ) -> discord.Message:
+        if (
+            interaction.response.type
+            == discord.InteractionResponseType.deferred_channel_message
+        ):
+            # replaces the thinking indicator, or the queue position
+            return await interaction.edit_original_response(content=None, embed=embed)
+
+        if interaction.response.is_done():
+            return await interaction.followup.send(embed=embed)
+
+        await interaction.response.send_message(embed=embed)
+
+        return await interaction.original_response()
+
+    async def _report_queued(self, interaction: discord.Interaction, position: int):
+        if not interaction.response.is_done():
+            await interaction.response.defer(thinking=True)
+
+        await interaction.edit_original_response(
+            content=f"eurocore is busy, you are number {position} in the queue"
+        )
+
+    async def track_job(self, interaction: discord.Interaction, job: Job):
+        """Reply to `interaction` with the job's status and keep it updated"""
+        job.set_message(await self._send(interaction, job.embed()), self._editor)
+
+        self.add_job(job)
+
+    async def publish_dispatch(
+        self,
+        interaction: discord.Interaction,
+        user: User,
+        method: str,
+        resource: str,
+        data: Optional[dict] = None,
+        ping: bool = False,
+        body: Optional[Body] = None,
+    ):
+        """Submit a dispatch job to eurocore and track it"""
+        dispatch = await self.submit_dispatch(
+            user,
+            method,
+            resource,
+            data,
+            ping,
+            body,
+            functools.partial(self._report_queued, interaction),
+        )
+
+        await self.track_job(interaction, dispatch)
+
+    async def publish_rmbpost(
+        self,
+        interaction: discord.Interaction,
+        user: User,
+        method: str,
+        resource: str,
+        data: Optional[dict] = None,
+        ping: bool = False,
+        body: Optional[Body] = None,
+    ):
+        """Submit an RMB post job to eurocore and track it"""
+        rmbpost = await self.submit_rmbpost(
+            user,
+            method,
+            resource,
+            data,
+            ping,
+            body,
+            functools.partial(self._report_queued, interaction),
+        )
+
+        await self.track_job(interaction, rmbpost)
+
+    async def publish_group(
+        self,
+        interaction: discord.Interaction,
+        group: JobGroup,
+        submissions: Dict[str, Callable[[], Awaitable[Job]]],
+    ):
+        """Make labelled submissions as one group, tracked in one message
+
+        At most `Bulk.concurrency` submissions are made at once. A failed
+        submission is listed in the group's summary and does not stop the
+        others.
+        """
+        group.set_message(await self._send(interaction, group.embed()), self._editor)
+
+        semaphore = asyncio.Semaphore(self._config.bulk.concurrency)
+
+        async def submit(label: str, factory: Callable[[], Awaitable[Job]]):
+            async with semaphore:
+                try:
+                    job = await factory()
+                except Exception as e:
+                    logger.warning("unable to submit %s: %s", label, e)
+                    group.fail(label, str(e) or type(e).__name__)
+                else:
+                    group.add(label, job)
+                    self.add_job(job)
+
+            try:
+                await group.refresh()
+            except discord.HTTPException:
+                logger.exception("unable to refresh job group: %s", group)
+
+        await asyncio.gather(
+            *(submit(label, factory) for label, factory in submissions.items())
+        )
+
+        group.close()
+
+        await group.refresh()
+
+        if group.finished:
+            await self.complete_group(group)
+
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """`Bot` running several gateway shards in one process
+
+    Runs `Sharding.ids`, or every shard if not set, out of `Sharding.count`
+    shards, or the number recommended by Discord if not set.
+    """
+
+    def shard_latencies(self) -> List[Tuple[int, float]]:
+        return self.latencies
+
+    async def on_shard_ready(self, shard_id: int):
+        logger.info(f"shard {shard_id} ready")
 
-            rmbpost.set_message(message)
+    async def on_shard_disconnect(self, shard_id: int):
+        logger.warning(f"shard {shard_id} disconnected")
 
-            self.jobs[rmbpost.id] = rmbpost
+    async def on_shard_resumed(self, shard_id: int):
+        logger.info(f"shard {shard_id} resumed")
@@ -0,0 +1,158 @@
+import csv
+import io
+import zipfile
+
+from dataclasses import dataclass
+from discord.ext import commands
+from typing import Dict, List, Optional
+
+MANIFEST = "manifest.csv"
+MANIFEST_FIELDS = ("file", "title", "nation", "category")
+
+
+@dataclass
+class BulkDispatch:
+    file: str
+    title: str
+    nation: str
+    subcategory: int
+    text: str
+
+    def data(self) -> dict:
+        """Request body for publishing the dispatch"""
+        return {
+            "title": self.title,
+            "nation": self.nation,
+            "category": int(str(self.subcategory)[:1]),
+            "subcategory": self.subcategory,
+            "text": self.text,
+        }
+
+
+def read_manifest(manifest: bytes) -> List[Dict[str, str]]:
+    try:
+        reader = csv.DictReader(io.StringIO(manifest.decode("utf-8-sig")))
+        rows = list(reader)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise commands.UserInputError(f"unreadable manifest: {e}")
+
+    missing = set(MANIFEST_FIELDS) - set(reader.fieldnames or [])
+
+    if missing:
+        raise commands.UserInputError(
+            f"manifest is missing columns: {', '.join(sorted(missing))}"
+        )
+
+    return [
+        {field: (row.get(field) or "").strip() for field in MANIFEST_FIELDS}
+        for row in rows
+    ]
+
+
+def read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    """Content of an archive member, at most `limit` bytes are decompressed"""
+    if info.file_size > limit:
+        raise commands.UserInputError(f"{info.filename} must be at most {limit} bytes")
+
+    try:
+        with zf.open(info) as f:
+            content = f.read(limit + 1)
+    except NotImplementedError:
+        raise commands.UserInputError(
+            f"{info.filename} uses an unsupported compression method"
+        )
+    except RuntimeError:
+        # zipfile raises RuntimeError for members that need a password
+        raise commands.UserInputError(f"{info.filename} is encrypted")
+
+    # the size in the archive's directory can be wrong
+    if len(content) > limit:
+        raise commands.UserInputError(f"{info.filename} must be at most {limit} bytes")
+
+    return content
+
+
+def read_bulk_dispatches(
+    archive: bytes,
+    manifest: Optional[bytes],
+    nations: List[str],
+    categories: Dict[str, str],
+    limit: int,
+    max_items: int,
+) -> List[BulkDispatch]:
+    """Dispatches described by a manifest, with their text from a zip archive
+
+    The manifest is a CSV file with `file`, `title`, `nation` and `category`
+    columns, either uploaded separately or included in the archive as
+    `manifest.csv`. Categories are given by subcategory code or name, e.g.
+    `305` or `Bulletin: Policy`. Every row is validated before anything is
+    published. Files over `limit` bytes, the manifest included, are rejected
+    without being fully decompressed.
+    """
+    codes = {name.lower(): code for code, name in categories.items()}
+
+    try:
+        with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+            if manifest is None:
+                try:
+                    info = zf.getinfo(MANIFEST)
+                except KeyError:
+                    raise commands.UserInputError(
+                        f"no manifest uploaded and no {MANIFEST} in the archive"
+                    )
+
+                manifest = read_member(zf, info, limit)
+
+            rows = read_manifest(manifest)
+
+            if not rows:
+                raise commands.UserInputError("manifest lists no dispatches")
+
+            if len(rows) > max_items:
+                raise commands.UserInputError(
+                    f"at most {max_items} dispatches can be published at once"
+                )
+
+            dispatches = []
+
+            for line, row in enumerate(rows, start=2):
+                file = row["file"]
+                nation = row["nation"].lower().replace(" ", "_")
+                category = codes.get(row["category"].lower(), row["category"])
+
+                if nation not in nations:
+                    raise commands.UserInputError(
+                        f"manifest line {line}: cannot publish as {nation}"
+                    )
+
+                if category not in categories:
+                    raise commands.UserInputError(
+                        f"manifest line {line}: unknown category {row['category']}"
+                    )
+
+                if any(dispatch.file == file for dispatch in dispatches):
+                    raise commands.UserInputError(
+                        f"manifest line {line}: {file} is listed more than once"
+                    )
+
+                try:
+                    info = zf.getinfo(file)
+                except KeyError:
+                    raise commands.UserInputError(
+                        f"manifest line {line}: {file} is not in the archive"
+                    )
+
+                content = read_member(zf, info, limit)
+
+                try:
+                    text = content.decode("UTF-8")
+                except UnicodeDecodeError:
+                    raise commands.UserInputError(f"{file} must be UTF-8 text")
+
+                dispatches.append(
+                    BulkDispatch(file, row["title"], nation, int(category), text)
+                )
+    except zipfile.BadZipFile:
+        raise commands.UserInputError("archive must be a zip file")
+
+    return dispatches
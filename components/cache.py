@@ -0,0 +1,70 @@
+import time
+
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING: Any = object()
+
+
+class TTLCache(Generic[K, V]):
+    """In-memory least recently used cache with expiring entries
+
+    Holds at most `size` entries, each for at most `ttl` seconds. Entries
+    are only ever kept in memory.
+    """
+
+    _size: int
+    _ttl: float
+    _entries: OrderedDict[K, Tuple[float, V]]
+
+    def __init__(self, size: int, ttl: float):
+        self._size = size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def get(self, key: K, default: Any = None) -> Optional[V]:
+        """Cached value of `key`, or `default` if missing or expired"""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def put(self, key: K, value: V, ttl: Optional[float] = None):
+        """Cache `value` for `key`, for `ttl` seconds instead of the default"""
+        expires_at = time.monotonic() + (self._ttl if ttl is None else ttl)
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K):
+        self._entries.pop(key, None)
+
+    def evict(self, predicate: Callable[[K], bool]):
+        """Remove every entry whose key matches `predicate`"""
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,308 @@
+import aiohttp
+import asyncio
+import logging
+import random
+import re
+import time
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypedDict,
+)
+
+from components.config import Requests
+
+logger = logging.getLogger("r4n")
+
+# PUT and DELETE queue a new eurocore job each time, so they are not retried
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+NATION_HEADERS = {"dispatches": "dispatch-nations", "rmbposts": "rmbpost-nations"}
+
+
+class JobStatus(TypedDict, total=False):
+    id: int
+    action: Literal["add", "edit", "remove"]
+    status: Literal["queued", "success", "failure"]
+    error: Optional[str]
+    created_at: str
+    modified_at: str
+    dispatch_id: Optional[int]
+    rmbpost_id: Optional[int]
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.requests if self.requests else 0.0
+
+
+Body = Callable[[], AsyncIterator[bytes]]
+"""Creates a streamed JSON request body, once for every attempt at sending it"""
+
+RequestHook = Callable[[str, str, Optional[int], float], None]
+"""Called with the method, endpoint, status (if any) and duration of a request"""
+
+
+def endpoint(method: str, resource: str) -> str:
+    """`resource` with ids replaced, so requests group by endpoint"""
+    return f"{method} {ID_SEGMENT.sub('/{id}', resource.split('?')[0])}"
+
+
+class RetryBudget:
+    """Caps retries at a fraction of requests, so an outage is not amplified
+
+    Every request deposits `ratio` of a retry, up to `limit`, and every retry
+    withdraws a whole one.
+    """
+
+    def __init__(self, ratio: float, limit: float):
+        self._ratio = ratio
+        self._limit = limit
+        self._balance = limit
+
+    def deposit(self):
+        self._balance = min(self._limit, self._balance + self._ratio)
+
+    def withdraw(self) -> bool:
+        if self._balance < 1:
+            return False
+
+        self._balance -= 1
+
+        return True
+
+
+class EurocoreClient:
+    """Client for the eurocore API
+
+    Interactive requests, made while a user waits on a response, and
+    background requests, made by job polling, have separate timeouts.
+    Read-only requests that fail with a connection error, a timeout or a
+    429/5xx response are retried with jittered backoff, up to
+    `Requests.retries` times and within the shared `RetryBudget`.
+    """
+
+    _session: aiohttp.ClientSession
+    _base_url: str
+    _config: Requests
+    _budget: RetryBudget
+    _hooks: List[RequestHook]
+
+    stats: Dict[str, EndpointStats]
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, config: Requests):
+        self._session = session
+        self._base_url = base_url
+        self._config = config
+        self._budget = RetryBudget(config.retry_ratio, config.retry_limit)
+        self._hooks = [self._record]
+
+        self.stats = {}
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    def add_hook(self, hook: RequestHook):
+        """Call `hook` after every request"""
+        self._hooks.append(hook)
+
+    def _record(self, method: str, name: str, status: Optional[int], elapsed: float):
+        stats = self.stats.setdefault(name, EndpointStats())
+        stats.requests += 1
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+        if status is None or status >= 400:
+            stats.errors += 1
+
+    def _notify(self, method: str, name: str, status: Optional[int], elapsed: float):
+        for hook in self._hooks:
+            try:
+                hook(method, name, status, elapsed)
+            except Exception:
+                logger.exception("request hook failed")
+
+    def _retryable(self, method: str, error: Exception) -> bool:
+        if method not in SAFE_METHODS:
+            return False
+
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRY_STATUSES
+
+        return isinstance(error, (aiohttp.ClientConnectionError, TimeoutError))
+
+    async def send(
+        self,
+        method: str,
+        resource: str,
+        *,
+        token: Optional[str] = None,
+        background: bool = False,
+        body: Optional[Body] = None,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        """Send a request to eurocore, the caller must release the response
+
+        `body` is streamed as the JSON request body, it is called again for
+        every retry.
+        """
+        method = method.upper()
+        name = endpoint(method, resource)
+        timeout = aiohttp.ClientTimeout(
+            total=self._config.background_timeout
+            if background
+            else self._config.interactive_timeout
+        )
+
+        headers = dict(kwargs.pop("headers", None) or {})
+
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        if body:
+            headers["Content-Type"] = "application/json"
+
+        # errors raised while producing the body reach us wrapped by aiohttp
+        body_errors: List[Exception] = []
+
+        async def stream() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in body():
+                    yield chunk
+            except Exception as e:
+                body_errors.append(e)
+                raise
+
+        self._budget.deposit()
+
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+
+            if body:
+                kwargs["data"] = stream()
+
+            try:
+                response = await self._session.request(
+                    method,
+                    f"{self._base_url}{resource}",
+                    headers=headers,
+                    timeout=timeout,
+                    **kwargs,
+                )
+            except Exception as e:
+                status = getattr(e, "status", None)
+                self._notify(method, name, status, time.perf_counter() - start)
+
+                if body_errors:
+                    raise body_errors[0]
+
+                if (
+                    attempt >= self._config.retries
+                    or not self._retryable(method, e)
+                    or not self._budget.withdraw()
+                ):
+                    raise
+
+                attempt += 1
+                self.stats[name].retries += 1
+
+                delay = self._config.retry_backoff * 2 ** (attempt - 1)
+                delay *= random.uniform(0.5, 1.5)
+
+                logger.info(
+                    "retrying %s in %.2fs (%d/%d): %s",
+                    name,
+                    delay,
+                    attempt,
+                    self._config.retries,
+                    e,
+                )
+
+                await asyncio.sleep(delay)
+                continue
+
+            self._notify(method, name, response.status, time.perf_counter() - start)
+
+            return response
+
+    @asynccontextmanager
+    async def request(
+        self, method: str, resource: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request to eurocore, see `send`"""
+        response = await self.send(method, resource, **kwargs)
+
+        async with response:
+            yield response
+
+    async def register(self, username: str, password: str) -> str:
+        """Create a eurocore account, returns its token"""
+        async with self.request(
+            "POST", "/register", json={"username": username, "password": password}
+        ) as response:
+            data = await response.json(encoding="UTF-8")
+
+            return data["token"]
+
+    async def login(self, username: str, password: str) -> str:
+        """Sign in to eurocore, returns a token"""
+        async with self.request(
+            "POST", "/login", json={"username": username, "password": password}
+        ) as response:
+            data = await response.json(encoding="UTF-8")
+
+            return data["token"]
+
+    async def job_status(self, location: str) -> JobStatus:
+        async with self.request("GET", location, background=True) as response:
+            return await response.json(encoding="UTF-8")
+
+    async def job_statuses(self, collection: str, keys: List[str]) -> List[JobStatus]:
+        """Statuses of several jobs in `collection` in one request"""
+        async with self.request(
+            "GET", collection, params={"ids": ",".join(keys)}, background=True
+        ) as response:
+            return await response.json(encoding="UTF-8")
+
+    async def nations(
+        self, collection: str, etag: Optional[str] = None
+    ) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Nations that can publish to `collection`, and the list's ETag
+
+        With `etag`, the request is conditional and the nations are None
+        if the list has not changed since.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+
+        async with self.request(
+            "HEAD", f"/{collection}", headers=headers, background=True
+        ) as response:
+            if response.status == 304:
+                return None, etag
+
+            nations = response.headers.get(NATION_HEADERS[collection], "")
+
+            return (
+                [nation for nation in nations.split(",") if nation],
+                response.headers.get("ETag"),
+            )
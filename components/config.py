@@ -1,9 +1,9 @@
 import logging
 import os
+import socket
 
-from dataclasses import dataclass
-from logtail import LogtailHandler
-from typing import Literal, Optional
+from dataclasses import dataclass, field
+from typing import List, Literal, Optional
 
 LEVEL = Literal["DEBUG", "INFO", "WARN", "ERROR"]
 
@@ -15,11 +15,155 @@ class Log:
     level: LEVEL = "INFO"
 
 
+@dataclass
+class Polling:
+    concurrency: int = 10
+    job_timeout: float = 5.0
+    pass_timeout: float = 9.0
+    tick: float = 1.0
+    initial_interval: float = 2.0
+    max_interval: float = 60.0
+    backoff: float = 1.5
+    jitter: float = 0.2
+    batch_size: int = 50
+
+
+@dataclass
+class Events:
+    port: Optional[int] = None
+    host: str = "127.0.0.1"
+    secret: Optional[str] = None
+    reconcile_interval: float = 60.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.port is not None
+
+
+@dataclass
+class Metrics:
+    port: Optional[int] = None
+    host: str = "127.0.0.1"
+
+    @property
+    def enabled(self) -> bool:
+        return self.port is not None
+
+
+@dataclass
+class Database:
+    path: str = "r4n.db"
+    flush_interval: float = 1.0
+    session_key: Optional[str] = None
+    instance_id: str = field(default_factory=socket.gethostname)
+    lease_ttl: float = 30.0
+    lease_renew_interval: float = 10.0
+
+
+@dataclass
+class Auth:
+    refresh_interval: float = 60.0
+    refresh_margin: float = 300.0
+
+
+@dataclass
+class Requests:
+    interactive_timeout: float = 10.0
+    background_timeout: float = 30.0
+    retries: int = 2
+    retry_backoff: float = 0.5
+    retry_ratio: float = 0.1
+    retry_limit: float = 10.0
+    upload_limit: int = 1024 * 1024
+    slow_threshold: float = 2.0
+
+
+@dataclass
+class RateLimits:
+    dispatch_rate: float = 30.0
+    dispatch_burst: int = 5
+    rmbpost_rate: float = 30.0
+    rmbpost_burst: int = 5
+
+
+@dataclass
+class Edits:
+    channel_rate: float = 1.0
+    channel_burst: int = 5
+    drain_timeout: float = 5.0
+
+
+@dataclass
+class Bulk:
+    concurrency: int = 3
+    max_items: int = 50
+    archive_limit: int = 10 * 1024 * 1024
+
+
+@dataclass
+class Caches:
+    nations_interval: float = 300.0
+    template_ttl: float = 300.0
+    template_size: int = 256
+    username_ttl: float = 3600.0
+    username_negative_ttl: float = 60.0
+    username_size: int = 1024
+
+
+@dataclass
+class Sharding:
+    enabled: bool = False
+    count: Optional[int] = None
+    ids: Optional[List[int]] = None
+
+
+@dataclass
+class Startup:
+    budget: Optional[float] = None
+    benchmark: bool = False
+
+
+def getenv_int(key: str, default: int) -> int:
+    value = os.getenv(key)
+
+    if not value:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{key} environment variable must be an integer")
+
+
+def getenv_float(key: str, default: float) -> float:
+    value = os.getenv(key)
+
+    if not value:
+        return default
+
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{key} environment variable must be a number")
+
+
 class Config:
     user: str
     discord_token: str
     eurocore_url: str
     log: Log
+    requests: Requests
+    polling: Polling
+    events: Events
+    metrics: Metrics
+    database: Database
+    auth: Auth
+    caches: Caches
+    startup: Startup
+    bulk: Bulk
+    rate_limits: RateLimits
+    edits: Edits
+    sharding: Sharding
 
     def __init__(self):
         if not (user := os.getenv("HOST_USER")):
@@ -45,6 +189,141 @@ class Config:
 
         self.log = Log(token, host, level)
 
+        self.requests = Requests(
+            interactive_timeout=getenv_float(
+                "EUROCORE_TIMEOUT", Requests.interactive_timeout
+            ),
+            background_timeout=getenv_float(
+                "EUROCORE_BACKGROUND_TIMEOUT", Requests.background_timeout
+            ),
+            retries=max(0, getenv_int("EUROCORE_RETRIES", Requests.retries)),
+            upload_limit=getenv_int("UPLOAD_LIMIT", Requests.upload_limit),
+            slow_threshold=getenv_float(
+                "SLOW_REQUEST_THRESHOLD", Requests.slow_threshold
+            ),
+        )
+
+        self.polling = Polling(
+            concurrency=max(1, getenv_int("POLL_CONCURRENCY", Polling.concurrency)),
+            job_timeout=getenv_float("POLL_JOB_TIMEOUT", Polling.job_timeout),
+            pass_timeout=getenv_float("POLL_PASS_TIMEOUT", Polling.pass_timeout),
+            tick=getenv_float("POLL_TICK", Polling.tick),
+            initial_interval=getenv_float(
+                "POLL_INITIAL_INTERVAL", Polling.initial_interval
+            ),
+            max_interval=getenv_float("POLL_MAX_INTERVAL", Polling.max_interval),
+            backoff=getenv_float("POLL_BACKOFF", Polling.backoff),
+            batch_size=max(1, getenv_int("POLL_BATCH_SIZE", Polling.batch_size)),
+        )
+
+        events_port = os.getenv("EVENTS_PORT")
+
+        self.events = Events(
+            port=int(events_port) if events_port else None,
+            host=os.getenv("EVENTS_HOST") or Events.host,
+            secret=os.getenv("EVENTS_SECRET"),
+            reconcile_interval=getenv_float(
+                "EVENTS_RECONCILE_INTERVAL", Events.reconcile_interval
+            ),
+        )
+
+        metrics_port = os.getenv("METRICS_PORT")
+
+        self.metrics = Metrics(
+            port=getenv_int("METRICS_PORT", 0) if metrics_port else None,
+            host=os.getenv("METRICS_HOST") or Metrics.host,
+        )
+
+        self.database = Database(
+            path=os.getenv("DATABASE_PATH") or Database.path,
+            flush_interval=getenv_float(
+                "DATABASE_FLUSH_INTERVAL", Database.flush_interval
+            ),
+            session_key=os.getenv("SESSION_KEY"),
+            instance_id=os.getenv("INSTANCE_ID") or socket.gethostname(),
+            lease_ttl=getenv_float("LEASE_TTL", Database.lease_ttl),
+            lease_renew_interval=getenv_float(
+                "LEASE_RENEW_INTERVAL", Database.lease_renew_interval
+            ),
+        )
+
+        if self.database.lease_renew_interval >= self.database.lease_ttl:
+            raise ValueError("LEASE_RENEW_INTERVAL must be shorter than LEASE_TTL")
+
+        self.auth = Auth(
+            refresh_interval=getenv_float(
+                "TOKEN_REFRESH_INTERVAL", Auth.refresh_interval
+            ),
+            refresh_margin=getenv_float("TOKEN_REFRESH_MARGIN", Auth.refresh_margin),
+        )
+
+        self.caches = Caches(
+            nations_interval=getenv_float(
+                "NATIONS_REFRESH_INTERVAL", Caches.nations_interval
+            ),
+            template_ttl=getenv_float("TEMPLATE_CACHE_TTL", Caches.template_ttl),
+            template_size=max(
+                1, getenv_int("TEMPLATE_CACHE_SIZE", Caches.template_size)
+            ),
+            username_ttl=getenv_float("USERNAME_CACHE_TTL", Caches.username_ttl),
+            username_negative_ttl=getenv_float(
+                "USERNAME_CACHE_NEGATIVE_TTL", Caches.username_negative_ttl
+            ),
+            username_size=max(
+                1, getenv_int("USERNAME_CACHE_SIZE", Caches.username_size)
+            ),
+        )
+
+        self.bulk = Bulk(
+            concurrency=max(1, getenv_int("BULK_CONCURRENCY", Bulk.concurrency)),
+            max_items=max(1, getenv_int("BULK_MAX_ITEMS", Bulk.max_items)),
+            archive_limit=getenv_int("BULK_ARCHIVE_LIMIT", Bulk.archive_limit),
+        )
+
+        self.rate_limits = RateLimits(
+            dispatch_rate=getenv_float("DISPATCH_RATE", RateLimits.dispatch_rate),
+            dispatch_burst=max(
+                1, getenv_int("DISPATCH_BURST", RateLimits.dispatch_burst)
+            ),
+            rmbpost_rate=getenv_float("RMBPOST_RATE", RateLimits.rmbpost_rate),
+            rmbpost_burst=max(1, getenv_int("RMBPOST_BURST", RateLimits.rmbpost_burst)),
+        )
+
+        self.edits = Edits(
+            channel_rate=getenv_float("EDIT_CHANNEL_RATE", Edits.channel_rate),
+            channel_burst=max(1, getenv_int("EDIT_CHANNEL_BURST", Edits.channel_burst)),
+            drain_timeout=getenv_float("EDIT_DRAIN_TIMEOUT", Edits.drain_timeout),
+        )
+
+        shard_count = os.getenv("SHARD_COUNT")
+        shard_ids = os.getenv("SHARD_IDS")
+
+        if shard_ids and not shard_count:
+            raise ValueError(
+                "SHARD_COUNT environment variable must be set with SHARD_IDS"
+            )
+
+        try:
+            ids = [int(id) for id in shard_ids.split(",")] if shard_ids else None
+        except ValueError:
+            raise ValueError(
+                "SHARD_IDS environment variable must be a list of integers"
+            )
+
+        self.sharding = Sharding(
+            enabled=bool(shard_count)
+            or os.getenv("SHARDED", "").lower() in ("1", "true"),
+            count=getenv_int("SHARD_COUNT", 1) if shard_count else None,
+            ids=ids,
+        )
+
+        startup_budget = os.getenv("STARTUP_BUDGET")
+
+        self.startup = Startup(
+            budget=getenv_float("STARTUP_BUDGET", 0.0) if startup_budget else None,
+            benchmark=os.getenv("STARTUP_BENCHMARK", "").lower() in ("1", "true"),
+        )
+
         self.user = user
         self.discord_token = discord_token
         self.eurocore_url = eurocore_url.strip("/")
@@ -52,6 +331,9 @@ class Config:
         logger = logging.getLogger("r4n")
 
         if self.log.token and self.log.host:
+            # logtail pulls in requests, only pay for it when it is used
+            from logtail import LogtailHandler
+
             handler = LogtailHandler(source_token=self.log.token, host=self.log.host)
         else:
             handler = logging.StreamHandler()
@@ -0,0 +1,238 @@
+import asyncio
+import discord
+import itertools
+import logging
+import time
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from components.config import Edits
+from components.limiter import TokenBucket
+
+logger = logging.getLogger("r4n")
+
+# how often stop checks whether every priority operation was sent
+DRAIN_POLL = 0.05
+
+Render = Callable[[], dict]
+"""Returns the keyword arguments for a message edit, called when it is sent"""
+
+EditHook = Callable[[str, float, bool], None]
+"""Called with the action, duration and success of every sent operation"""
+
+OnFailure = Callable[[], None]
+"""Called when an edit could not be sent, e.g. to let it be sent again"""
+
+
+@dataclass
+class Operation:
+    kind: str
+    action: Callable[[], Awaitable]
+    priority: bool
+    created_at: float = field(default_factory=time.monotonic)
+    on_failure: Optional[OnFailure] = None
+
+    def key(self) -> tuple:
+        """Sort key, priority operations first and then oldest first"""
+        return not self.priority, self.created_at
+
+
+class EditScheduler:
+    """Sends message edits and replies within per-channel budgets
+
+    Each channel has a token bucket of `Edits.channel_burst` operations,
+    refilling at `Edits.channel_rate` per second, so bursts of job updates
+    are spread out instead of running into Discord's rate limits. Edits to a
+    message that is still waiting are collapsed into one, rendered with the
+    latest state when it is sent. Priority operations, e.g. the final edit
+    of a finished job and its ping, are sent before progress edits.
+    """
+
+    _config: Edits
+    _pending: Dict[int, Dict[Hashable, Operation]]
+    _buckets: Dict[int, TokenBucket]
+    _running: Set[asyncio.Task]
+    _wakeup: asyncio.Event
+    _worker: Optional[asyncio.Task]
+    _ids: itertools.count
+    _hooks: List[EditHook]
+
+    coalesced: int
+    """Number of edits collapsed into an edit that was already waiting"""
+
+    def __init__(self, config: Edits):
+        self._config = config
+        self._pending = {}
+        self._buckets = {}
+        self._running = set()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._ids = itertools.count()
+        self._hooks = []
+
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return sum(len(operations) for operations in self._pending.values())
+
+    def add_hook(self, hook: EditHook):
+        """Call `hook` after every operation is sent"""
+        self._hooks.append(hook)
+
+    def _schedule(
+        self,
+        channel_id: int,
+        key: Hashable,
+        action: Callable[[], Awaitable],
+        priority: bool,
+        on_failure: Optional[OnFailure] = None,
+    ):
+        operations = self._pending.setdefault(channel_id, {})
+
+        if key in operations:
+            self.coalesced += 1
+
+            operation = operations[key]
+            operation.action = action
+            operation.priority = operation.priority or priority
+            operation.on_failure = on_failure
+        else:
+            operations[key] = Operation(key[0], action, priority, on_failure=on_failure)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+
+        self._wakeup.set()
+
+    def edit(
+        self,
+        message: discord.Message,
+        render: Render,
+        priority: bool = False,
+        on_failure: Optional[OnFailure] = None,
+    ):
+        """Edit `message` with the keyword arguments returned by `render`
+
+        `on_failure` is called if the edit, or the edit it was collapsed
+        into, could not be sent.
+        """
+        self._schedule(
+            message.channel.id,
+            ("edit", message.id),
+            lambda: message.edit(**render()),
+            priority,
+            on_failure,
+        )
+
+    def reply(self, message: discord.Message, content: str, priority: bool = True):
+        """Reply to `message`, replies are never collapsed"""
+        self._schedule(
+            message.channel.id,
+            ("reply", next(self._ids)),
+            lambda: message.reply(content),
+            priority,
+        )
+
+    def send(
+        self,
+        channel: discord.abc.Messageable,
+        content: str,
+        priority: bool = True,
+    ):
+        """Send a message to `channel`, messages are never collapsed"""
+        self._schedule(
+            channel.id,
+            ("send", next(self._ids)),
+            lambda: channel.send(content),
+            priority,
+        )
+
+    async def _run(self, operation: Operation):
+        start = time.monotonic()
+        success = False
+
+        try:
+            await operation.action()
+            success = True
+        except Exception:
+            logger.exception("unable to update message")
+
+        if not success and operation.on_failure:
+            try:
+                operation.on_failure()
+            except Exception:
+                logger.exception("edit failure callback failed")
+
+        for hook in self._hooks:
+            try:
+                hook(operation.kind, time.monotonic() - start, success)
+            except Exception:
+                logger.exception("edit hook failed")
+
+    def _next(self) -> Optional[float]:
+        """Start every operation the budgets allow, returns the time to wait"""
+        wait = None
+
+        for channel_id, operations in list(self._pending.items()):
+            if not operations:
+                del self._pending[channel_id]
+                continue
+
+            bucket = self._buckets.setdefault(
+                channel_id,
+                TokenBucket(self._config.channel_rate, self._config.channel_burst),
+            )
+
+            while operations and bucket.take():
+                key = min(operations, key=lambda key: operations[key].key())
+
+                task = asyncio.create_task(self._run(operations.pop(key)))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            if operations:
+                delay = bucket.wait_time()
+                wait = delay if wait is None else min(wait, delay)
+
+        return wait
+
+    async def _work(self):
+        while True:
+            self._wakeup.clear()
+
+            wait = self._next()
+
+            # sleep until something is scheduled or a budget allows more
+            try:
+                async with asyncio.timeout(wait):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+
+    async def stop(self):
+        """Stop sending, after the waiting priority operations are sent
+
+        Final edits and pings get up to `Edits.drain_timeout` seconds, within
+        their channels' budgets, progress edits still waiting are dropped.
+        """
+        for operations in self._pending.values():
+            for key in [key for key, op in operations.items() if not op.priority]:
+                del operations[key]
+
+        try:
+            async with asyncio.timeout(self._config.drain_timeout):
+                while len(self) and self._worker and not self._worker.done():
+                    await asyncio.sleep(DRAIN_POLL)
+
+                if self._running:
+                    await asyncio.wait(self._running)
+        except TimeoutError:
+            logger.warning("dropped %d message updates on shutdown", len(self))
+
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+        if self._running:
+            await asyncio.wait(self._running)
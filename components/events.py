@@ -0,0 +1,87 @@
+import hmac
+import logging
+
+from aiohttp import web
+from typing import Awaitable, Callable, Optional
+
+from components.config import Events
+
+logger = logging.getLogger("r4n")
+
+EventHandler = Callable[[str, dict], Awaitable[bool]]
+
+
+class JobEventReceiver:
+    """Webhook receiver for eurocore job events
+
+    eurocore (or anything else) POSTs `{"type": "dispatch", "job": {...}}` to
+    `/events`, where `job` has the same shape as a job status response. Each
+    event is passed to `handler`, which returns whether the job was known and
+    raises `ValueError` if its status cannot be applied, malformed events are
+    answered with 400. When `Events.secret` is set, requests must carry it as
+    a bearer token.
+    """
+
+    _config: Events
+    _handler: EventHandler
+    _runner: Optional[web.AppRunner]
+
+    def __init__(self, config: Events, handler: EventHandler):
+        self._config = config
+        self._handler = handler
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/events", self._receive)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self._config.host, self._config.port)
+        await site.start()
+
+        logger.info(
+            "listening for job events on %s:%d", self._config.host, self._config.port
+        )
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _receive(self, request: web.Request) -> web.Response:
+        if self._config.secret and not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {self._config.secret}"
+        ):
+            raise web.HTTPUnauthorized()
+
+        try:
+            event = await request.json()
+            kind = event["type"]
+            data = event["job"]
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text="malformed job event")
+
+        if (
+            not isinstance(kind, str)
+            or not isinstance(data, dict)
+            or not isinstance(data.get("id"), (int, str))
+            or not isinstance(data.get("status"), str)
+            or not isinstance(data.get("modified_at"), str)
+        ):
+            raise web.HTTPBadRequest(text="malformed job event")
+
+        logger.debug("received %s job event: %s", kind, data["id"])
+
+        try:
+            known = await self._handler(kind, data)
+        except ValueError as e:
+            logger.warning("malformed %s job event: %s", kind, e)
+
+            raise web.HTTPBadRequest(text="malformed job event")
+
+        if not known:
+            raise web.HTTPNotFound(text="unknown job")
+
+        return web.Response(status=204)
@@ -1,18 +1,27 @@
-import aiohttp
 import re
 import discord
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, Dict, Literal, Optional
 
+from .client import EurocoreClient, JobStatus
 from .user import User
 
+if TYPE_CHECKING:
+    from .edits import EditScheduler
+
 Action = Literal["add", "edit", "remove"]
 Status = Literal["queued", "success", "failure"]
 
 ERROR_REGEX = re.compile(r"^(.+)</p>")
 
+# times a failed final edit is sent again, finished jobs are no longer polled
+FINAL_EDIT_RETRIES = 3
+
 
 class Job:
+    kind: str
+
     _id: str
     _user: User
     _location: str
@@ -22,6 +31,13 @@ class Job:
     _error: Optional[str]
     _ping_on_completion: bool
     _message: Optional[discord.Message]
+    _editor: Optional["EditScheduler"]
+    _fingerprint: Optional[tuple]
+    _edit_retries: int
+    _group: Optional["JobGroup"]
+
+    skipped_edits: int = 0
+    """Number of message edits skipped because nothing visible changed"""
 
     def __init__(
         self,
@@ -42,23 +58,135 @@ class Job:
         self._status = status
         self._error = error
         self._ping_on_completion = ping_on_completion
+        self._message = None
+        self._editor = None
+        self._fingerprint = None
+        self._edit_retries = 0
+        self._group = None
 
     def __repr__(self):
         return f"Job(id={self._id}, status={self._status})"
 
-    async def update(self, client: aiohttp.ClientSession, base_url: str):
-        pass
+    async def update(self, client: EurocoreClient):
+        self.apply(await client.job_status(self._location))
+
+        await self.refresh()
+
+    def apply(self, data: JobStatus):
+        """Update the job from a eurocore job status response"""
+        # parsed first, so a malformed response leaves the job unchanged
+        modified_at = datetime.strptime(
+            data["modified_at"], "%Y-%m-%dT%H:%M:%S.%fZ"
+        ).replace(tzinfo=timezone.utc)
+
+        if data.get("error"):
+            self.error = data["error"]
+
+        self._status = data["status"]
+        self._modified_at = modified_at
 
     def embed(self) -> discord.Embed:
         pass
 
-    def set_message(self, message: discord.Message):
+    @property
+    def label(self) -> str:
+        """Short name of the job, e.g. in completion notices"""
+        return self._id
+
+    def fingerprint(self) -> tuple:
+        """State shown in the job's embed, used to detect changes"""
+        # the embed shows the modification time to the second
+        return self._status, int(self._modified_at.timestamp()), self._error
+
+    async def refresh(self):
+        """Edit the job's message, if anything shown in it has changed"""
+        if self._group:
+            await self._group.refresh()
+            return
+
+        fingerprint = self.fingerprint()
+
+        if not self._message or fingerprint == self._fingerprint:
+            Job.skipped_edits += 1
+            return
+
+        if self._editor is not None:
+            self._queue_edit(fingerprint)
+            return
+
+        await self._message.edit(embed=self.embed())
+
+        self._fingerprint = fingerprint
+
+    def _queue_edit(self, fingerprint: tuple):
+        self._fingerprint = fingerprint
+
+        self._editor.edit(
+            self._message,
+            lambda: {"embed": self.embed()},
+            priority=self._status != "queued",
+            on_failure=lambda: self._edit_failed(fingerprint),
+        )
+
+    def _edit_failed(self, fingerprint: tuple):
+        """Let the next refresh edit again, final edits are retried now"""
+        if self._fingerprint != fingerprint:
+            return
+
+        self._fingerprint = None
+
+        if self._status != "queued" and self._edit_retries < FINAL_EDIT_RETRIES:
+            self._edit_retries += 1
+            self._queue_edit(fingerprint)
+
+    def set_message(
+        self, message: discord.Message, editor: Optional["EditScheduler"] = None
+    ):
+        """Show the job in `message`, edited through `editor` if given"""
         self._message = message
+        self._editor = editor
+        self._fingerprint = self.fingerprint()
+
+    def set_group(self, group: "JobGroup"):
+        self._group = group
+
+    def to_record(self) -> dict:
+        """Fields needed to restore the job after a restart"""
+        return {
+            "id": self._id,
+            "kind": self.kind,
+            "location": self._location,
+            "user_id": self._user.id,
+            "user_name": self._user.name,
+            "guild_id": self._message.guild.id
+            if self._message and self._message.guild
+            else None,
+            "channel_id": self._message.channel.id if self._message else None,
+            "message_id": self._message.id if self._message else None,
+            "ping": self._ping_on_completion,
+            "created_at": self._created_at.isoformat(),
+            "modified_at": self._modified_at.isoformat(),
+            "status": self._status,
+        }
 
     @property
     def id(self) -> str:
         return self._id
 
+    @property
+    def user(self) -> User:
+        return self._user
+
+    @property
+    def collection(self) -> str:
+        """Path of the eurocore collection the job's status lives in"""
+        return self._location.rsplit("/", 1)[0]
+
+    @property
+    def key(self) -> str:
+        """Id of the job within its collection"""
+        return self._location.rsplit("/", 1)[1]
+
     @property
     def status(self) -> Status:
         return self._status
@@ -71,6 +199,15 @@ class Job:
     def message(self) -> Optional[discord.Message]:
         return self._message
 
+    @property
+    def group(self) -> Optional["JobGroup"]:
+        return self._group
+
+    @property
+    def url(self) -> Optional[str]:
+        """Link to what the job published, once it has"""
+        return None
+
     @property
     def error(self) -> Optional[str]:
         return self._error
@@ -84,6 +221,8 @@ class Job:
 
 
 class Dispatch(Job):
+    kind = "dispatch"
+
     _job_id: int
     _dispatch_id: Optional[int]
     _action: Literal["add", "edit", "remove"]
@@ -101,7 +240,7 @@ class Dispatch(Job):
         ping_on_completion: bool = False,
     ):
         super().__init__(
-            f"dispatch-{job_id}",
+            f"{self.kind}-{job_id}",
             user,
             location,
             created_at,
@@ -118,9 +257,32 @@ class Dispatch(Job):
     def __repr__(self):
         return f"Dispatch(id={self._job_id}, status={self._status})"
 
+    @property
+    def label(self) -> str:
+        return f"Dispatch {self._job_id}"
+
+    @classmethod
+    def from_record(cls, record: dict, user: User) -> "Dispatch":
+        return cls(
+            job_id=record["job_id"],
+            action=record["action"],
+            user=user,
+            location=record["location"],
+            created_at=datetime.fromisoformat(record["created_at"]),
+            modified_at=datetime.fromisoformat(record["modified_at"]),
+            status=record["status"],
+            ping_on_completion=bool(record["ping"]),
+        )
+
+    def to_record(self) -> dict:
+        return {**super().to_record(), "job_id": self._job_id, "action": self._action}
+
+    def fingerprint(self) -> tuple:
+        return *super().fingerprint(), self._dispatch_id
+
     def embed(self) -> discord.Embed:
         embed = discord.Embed(
-            title=f"Dispatch {self._job_id}: {self._status.title()}",
+            title=f"{self.label}: {self._status.title()}",
             color=discord.Color.blurple(),
         )
 
@@ -138,35 +300,32 @@ class Dispatch(Job):
             inline=True,
         )
 
-        if self._action != "remove" and self._dispatch_id:
-            embed.add_field(
-                name="View Dispatch",
-                value=f"https://www.nationstates.net/page=dispatch/id={self._dispatch_id}",
-                inline=False,
-            )
+        if self.url:
+            embed.add_field(name="View Dispatch", value=self.url, inline=False)
 
         embed.add_field(name="Error", value=f"```{self.error}```", inline=False)
         embed.set_footer(text=f"Initiated by {self._user.name}")
 
         return embed
 
-    async def update(self, client: aiohttp.ClientSession, base_url: str):
-        async with client.get(url=f"{base_url}{self._location}") as response:
-            data = await response.json(encoding="UTF-8")
+    def apply(self, data: JobStatus):
+        dispatch_id = data["dispatch_id"]
 
-            if data.get("error"):
-                self.error = data["error"]
+        super().apply(data)
 
-            self._status = data["status"]
-            self._modified_at = datetime.strptime(
-                data["modified_at"], "%Y-%m-%dT%H:%M:%S.%fZ"
-            ).replace(tzinfo=timezone.utc)
-            self._dispatch_id = data["dispatch_id"]
+        self._dispatch_id = dispatch_id
 
-            await self._message.edit(embed=self.embed())
+    @property
+    def url(self) -> Optional[str]:
+        if self._action == "remove" or not self._dispatch_id:
+            return None
+
+        return f"https://www.nationstates.net/page=dispatch/id={self._dispatch_id}"
 
 
 class RMBPost(Job):
+    kind = "rmbpost"
+
     _job_id: int
     _rmbpost_id: Optional[int]
 
@@ -182,7 +341,7 @@ class RMBPost(Job):
         ping_on_completion: bool = False,
     ):
         super().__init__(
-            f"rmbpost-{job_id}",
+            f"{self.kind}-{job_id}",
             user,
             location,
             created_at,
@@ -198,9 +357,31 @@ class RMBPost(Job):
     def __repr__(self):
         return f"RMBPost(id={self._job_id}, status={self._status})"
 
+    @property
+    def label(self) -> str:
+        return f"RMBPost {self._job_id}"
+
+    @classmethod
+    def from_record(cls, record: dict, user: User) -> "RMBPost":
+        return cls(
+            job_id=record["job_id"],
+            user=user,
+            location=record["location"],
+            created_at=datetime.fromisoformat(record["created_at"]),
+            modified_at=datetime.fromisoformat(record["modified_at"]),
+            status=record["status"],
+            ping_on_completion=bool(record["ping"]),
+        )
+
+    def to_record(self) -> dict:
+        return {**super().to_record(), "job_id": self._job_id}
+
+    def fingerprint(self) -> tuple:
+        return *super().fingerprint(), self._rmbpost_id
+
     def embed(self) -> discord.Embed:
         embed = discord.Embed(
-            title=f"RMBPost {self._job_id}: {self._status.title()}",
+            title=f"{self.label}: {self._status.title()}",
             color=discord.Color.blurple(),
         )
 
@@ -213,33 +394,233 @@ class RMBPost(Job):
         )
         embed.add_field(
             name="Job Modified",
-            value=f"<t:{int(self._created_at.timestamp())}:R>",
+            value=f"<t:{int(self._modified_at.timestamp())}:R>",
             inline=True,
         )
 
-        if self._rmbpost_id:
-            embed.add_field(
-                name="View RMB Post",
-                value=f"https://www.nationstates.net/page=rmb/postid={self._rmbpost_id}",
-                inline=False,
-            )
+        if self.url:
+            embed.add_field(name="View RMB Post", value=self.url, inline=False)
 
         embed.add_field(name="Error", value=f"```{self.error}```", inline=False)
         embed.set_footer(text=f"Initiated by {self._user.name}")
 
         return embed
 
-    async def update(self, client: aiohttp.ClientSession, base_url: str):
-        async with client.get(url=f"{base_url}{self._location}") as response:
-            data = await response.json(encoding="UTF-8")
+    def apply(self, data: JobStatus):
+        rmbpost_id = data["rmbpost_id"]
+
+        super().apply(data)
+
+        self._rmbpost_id = rmbpost_id
+
+    @property
+    def url(self) -> Optional[str]:
+        if not self._rmbpost_id:
+            return None
+
+        return f"https://www.nationstates.net/page=rmb/postid={self._rmbpost_id}"
+
+
+class JobGroup:
+    """Jobs submitted together and tracked in a single summary message
+
+    Jobs in a group have no message of their own, refreshing any of them
+    edits the group's summary instead. Each job is labelled, e.g. with the
+    file or region it was submitted for, and submissions that failed are
+    listed alongside them.
+    """
+
+    _title: str
+    _user: User
+    _total: int
+    _ping_on_completion: bool
+    _jobs: Dict[str, Job]
+    _failures: Dict[str, str]
+    _submitting: bool
+    _completed: bool
+    _message: Optional[discord.Message]
+    _editor: Optional["EditScheduler"]
+    _fingerprint: Optional[tuple]
+    _edit_retries: int
+
+    def __init__(
+        self, title: str, user: User, total: int, ping_on_completion: bool = False
+    ):
+        self._title = title
+        self._user = user
+        self._total = total
+        self._ping_on_completion = ping_on_completion
+        self._jobs = {}
+        self._failures = {}
+        self._submitting = True
+        self._completed = False
+        self._message = None
+        self._editor = None
+        self._fingerprint = None
+        self._edit_retries = 0
+
+    def __repr__(self):
+        return f"JobGroup(title={self._title}, jobs={len(self._jobs)})"
+
+    def add(self, label: str, job: Job):
+        job.set_group(self)
+        self._jobs[label] = job
+
+    def fail(self, label: str, error: str):
+        """Record a submission that eurocore did not accept"""
+        self._failures[label] = error
+
+    def close(self):
+        """Mark every submission as made"""
+        self._submitting = False
+
+    def complete(self) -> bool:
+        """Mark the group completed, returns False if it already was"""
+        if self._completed:
+            return False
+
+        self._completed = True
+
+        return True
+
+    def fingerprint(self) -> tuple:
+        return (
+            self._submitting,
+            tuple((label, job.fingerprint()) for label, job in self._jobs.items()),
+            tuple(self._failures),
+        )
+
+    def embed(self) -> discord.Embed:
+        statuses = Counter(job.status for job in self._jobs.values())
+
+        if self._failures:
+            statuses["not submitted"] = len(self._failures)
+
+        submitted = len(self._jobs) + len(self._failures)
+
+        embed = discord.Embed(
+            title=f"{self._title}: {submitted}/{self._total} submitted",
+            color=discord.Color.blurple(),
+        )
+
+        embed.add_field(
+            name="Status",
+            value=", ".join(f"{count} {status}" for status, count in statuses.items())
+            or "submitting",
+            inline=False,
+        )
+
+        lines = []
+
+        for label, job in self._jobs.items():
+            line = f"`{label}`: {job.status}"
+
+            if job.url:
+                line += f" ([view]({job.url}))"
+            elif job.error:
+                line += f" ({job.error})"
+
+            lines.append(line)
+
+        lines.extend(
+            f"`{label}`: not submitted ({error})"
+            for label, error in self._failures.items()
+        )
+
+        description = ""
+
+        for i, line in enumerate(lines):
+            if len(description) + len(line) > 3900:
+                description += f"... and {len(lines) - i} more"
+                break
+
+            description += f"{line}\n"
+
+        embed.description = description
+        embed.set_footer(text=f"Initiated by {self._user.name}")
+
+        return embed
+
+    async def refresh(self):
+        """Edit the summary, if anything shown in it has changed"""
+        fingerprint = self.fingerprint()
+
+        if not self._message or fingerprint == self._fingerprint:
+            Job.skipped_edits += 1
+            return
 
-            if data.get("error"):
-                self.error = data["error"]
+        if self._editor is not None:
+            self._queue_edit(fingerprint)
+            return
 
-            self._status = data["status"]
-            self._modified_at = datetime.strptime(
-                data["modified_at"], "%Y-%m-%dT%H:%M:%S.%fZ"
-            ).replace(tzinfo=timezone.utc)
-            self._rmbpost_id = data["rmbpost_id"]
+        # claimed before editing, so concurrent refreshes do not edit twice
+        self._fingerprint = fingerprint
 
+        try:
             await self._message.edit(embed=self.embed())
+        except Exception:
+            self._fingerprint = None
+            raise
+
+    def _queue_edit(self, fingerprint: tuple):
+        self._fingerprint = fingerprint
+
+        self._editor.edit(
+            self._message,
+            lambda: {"embed": self.embed()},
+            priority=self.finished,
+            on_failure=lambda: self._edit_failed(fingerprint),
+        )
+
+    def _edit_failed(self, fingerprint: tuple):
+        """Let the next refresh edit again, final edits are retried now"""
+        if self._fingerprint != fingerprint:
+            return
+
+        self._fingerprint = None
+
+        if self.finished and self._edit_retries < FINAL_EDIT_RETRIES:
+            self._edit_retries += 1
+            self._queue_edit(fingerprint)
+
+    def set_message(
+        self, message: discord.Message, editor: Optional["EditScheduler"] = None
+    ):
+        """Show the group in `message`, edited through `editor` if given"""
+        self._message = message
+        self._editor = editor
+        self._fingerprint = self.fingerprint()
+
+    @property
+    def user(self) -> User:
+        return self._user
+
+    @property
+    def label(self) -> str:
+        return self._title
+
+    @property
+    def status(self) -> str:
+        return "finished" if self.finished else "queued"
+
+    @property
+    def ping_on_completion(self) -> bool:
+        return self._ping_on_completion
+
+    @property
+    def message(self) -> Optional[discord.Message]:
+        return self._message
+
+    @property
+    def jobs(self) -> Dict[str, Job]:
+        return self._jobs
+
+    @property
+    def finished(self) -> bool:
+        """Whether every submission has been made and every job has finished"""
+        return not self._submitting and all(
+            job.status != "queued" for job in self._jobs.values()
+        )
+
+
+JOB_TYPES = {Dispatch.kind: Dispatch, RMBPost.kind: RMBPost}
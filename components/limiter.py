@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Hashable, Optional
+
+logger = logging.getLogger("r4n")
+
+QueuedCallback = Callable[[int], Awaitable[None]]
+"""Called with a caller's position in the queue when it has to wait"""
+
+
+class TokenBucket:
+    """Tokens refilling at `rate` per second, up to `burst`"""
+
+    _rate: float
+    _burst: int
+    _tokens: float
+    _updated: float
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def take(self) -> bool:
+        """Take a token, returns False if there are none"""
+        self._refill()
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+
+        return True
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        self._refill()
+
+        return max(0.0, (1 - self._tokens) / self._rate)
+
+
+class RateLimiter:
+    """Token bucket shared by every user, with a fair queue
+
+    Tokens refill at `rate` per second, up to `burst`. Once they run out,
+    callers wait in a queue per user and the queues are served round robin,
+    so one user submitting many jobs at once cannot hold everyone else back.
+    """
+
+    _bucket: TokenBucket
+    _queues: OrderedDict[Hashable, Deque[asyncio.Future]]
+    _server: Optional[asyncio.Task]
+
+    def __init__(self, rate: float, burst: int):
+        self._bucket = TokenBucket(rate, burst)
+        self._queues = OrderedDict()
+        self._server = None
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def position(self, key: Hashable, waiter: asyncio.Future) -> int:
+        """1-based position of `waiter` in the queue, in serving order"""
+        queues = list(self._queues.items())
+        index = next(i for i, (k, _) in enumerate(queues) if k == key)
+        depth = self._queues[key].index(waiter)
+
+        # every queue is served once per round, in order
+        ahead = sum(min(len(queue), depth) for _, queue in queues)
+        ahead += sum(1 for _, queue in queues[:index] if len(queue) > depth)
+
+        return ahead + 1
+
+    async def acquire(self, key: Hashable, on_queued: Optional[QueuedCallback] = None):
+        """Take a token for `key`, waiting in its queue if there are none"""
+        if not self._queues and self._bucket.take():
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+
+        if self._server is None or self._server.done():
+            self._server = asyncio.create_task(self._serve())
+
+        try:
+            if on_queued:
+                try:
+                    await on_queued(self.position(key, waiter))
+                except Exception:
+                    logger.exception("unable to report queue position")
+
+            await waiter
+        except asyncio.CancelledError:
+            self._discard(key, waiter)
+            raise
+
+    def _discard(self, key: Hashable, waiter: asyncio.Future):
+        queue = self._queues.get(key)
+
+        if queue is None or waiter not in queue:
+            return
+
+        queue.remove(waiter)
+
+        if not queue:
+            del self._queues[key]
+
+    async def _serve(self):
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+
+            # cancelled waiters are skipped without spending a token
+            if queue[0].done():
+                queue.popleft()
+            elif self._bucket.take():
+                queue.popleft().set_result(None)
+            else:
+                await asyncio.sleep(self._bucket.wait_time())
+                continue
+
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
@@ -0,0 +1,286 @@
+import bisect
+import logging
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from components.config import Metrics
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger("r4n")
+
+Labels = Tuple[str, ...]
+Collect = Callable[[], Dict[Labels, float]]
+"""Returns the current value of a metric by label values, called on scrape"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(
+        f'{name}="{escape(str(value))}"' for name, value in zip(names, values)
+    )
+
+    return f"{{{pairs}}}"
+
+
+class Metric:
+    """Metric in the Prometheus text format, with optional labels
+
+    Values are either recorded as things happen, or read from `collect` when
+    the metric is scraped, for values the bot already keeps track of.
+    """
+
+    kind: str = "untyped"
+
+    name: str
+    help: str
+    labels: Labels
+
+    _values: Dict[Labels, float]
+    _collect: Optional[Collect]
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        collect: Optional[Collect] = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+        self._values = {}
+        self._collect = collect
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(labels[name] for name in self.labels)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        """Suffix, label names, label values and value of each sample"""
+        values = self._collect() if self._collect else self._values
+
+        for key, value in values.items():
+            yield "", self.labels, key, value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(names, values)} {value}")
+
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values, e.g. durations in seconds"""
+
+    kind = "histogram"
+
+    _buckets: Tuple[float, ...]
+    _observations: Dict[Labels, Tuple[List[int], List[float]]]
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Tuple[float, ...] = BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+
+        self._buckets = buckets
+        self._observations = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+
+        if key not in self._observations:
+            # one count per bucket plus +Inf, and the sum
+            self._observations[key] = ([0] * (len(self._buckets) + 1), [0.0])
+
+        counts, total = self._observations[key]
+        counts[bisect.bisect_left(self._buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        names = (*self.labels, "le")
+
+        for key, (counts, total) in self._observations.items():
+            cumulative = 0
+
+            for bound, count in zip((*self._buckets, "+Inf"), counts):
+                cumulative += count
+                yield "_bucket", names, (*key, str(bound)), cumulative
+
+            yield "_sum", self.labels, key, total[0]
+            yield "_count", self.labels, key, cumulative
+
+
+class Registry:
+    """Metrics to expose, rendered in the Prometheus text format"""
+
+    _metrics: List[Metric]
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+
+        return metric
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                logger.exception("unable to collect metric: %s", metric.name)
+
+        return "\n".join(lines) + "\n"
+
+
+class BotMetrics(Registry):
+    """Metrics recorded by the bot as it runs"""
+
+    requests: Histogram
+    request_errors: Counter
+    poll_passes: Histogram
+    poll_errors: Counter
+    edits: Histogram
+    edit_errors: Counter
+    logins: Counter
+    command_errors: Counter
+
+    def __init__(self):
+        super().__init__()
+
+        self.requests = self.register(
+            Histogram(
+                "r4n_eurocore_request_duration_seconds",
+                "Duration of eurocore requests",
+                ("endpoint",),
+            )
+        )
+        self.request_errors = self.register(
+            Counter(
+                "r4n_eurocore_request_errors_total",
+                "eurocore requests that failed or returned an error status",
+                ("endpoint",),
+            )
+        )
+        self.poll_passes = self.register(
+            Histogram("r4n_poll_duration_seconds", "Duration of job polling passes")
+        )
+        self.poll_errors = self.register(
+            Counter("r4n_poll_errors_total", "Job polling passes that failed")
+        )
+        self.edits = self.register(
+            Histogram(
+                "r4n_discord_edit_duration_seconds",
+                "Duration of Discord message edits, replies and messages",
+                ("action",),
+            )
+        )
+        self.edit_errors = self.register(
+            Counter(
+                "r4n_discord_edit_errors_total",
+                "Discord message edits, replies and messages that failed",
+                ("action",),
+            )
+        )
+        self.logins = self.register(
+            Counter(
+                "r4n_login_refreshes_total",
+                "Users signed in again, because their token was expiring, expired or rejected",
+                ("reason", "result"),
+            )
+        )
+        self.command_errors = self.register(
+            Counter(
+                "r4n_command_errors_total",
+                "Slash commands that failed, by error",
+                ("error",),
+            )
+        )
+
+
+class MetricsServer:
+    """Serves the metrics of `registry` at `/metrics`"""
+
+    _config: Metrics
+    _registry: Registry
+    _runner: Optional["web.AppRunner"]
+
+    def __init__(self, config: Metrics, registry: Registry):
+        self._config = config
+        self._registry = registry
+        self._runner = None
+
+    async def start(self):
+        # aiohttp.web is only needed when serving metrics
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._scrape)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self._config.host, self._config.port)
+        await site.start()
+
+        logger.info("serving metrics on %s:%d", self._config.host, self._config.port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _scrape(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(
+            body=self._registry.render().encode(),
+            headers={
+                "Content-Type": CONTENT_TYPE,
+                "Cache-Control": "no-store",
+            },
+        )
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+
+from dataclasses import dataclass, field
+from discord.ext import commands
+from typing import Dict, List, Optional
+
+from components.client import NATION_HEADERS, EurocoreClient
+from components.config import Caches
+
+logger = logging.getLogger("r4n")
+
+# commands have to answer Discord within 3 seconds
+COLD_WAIT = 2.0
+
+
+@dataclass
+class NationList:
+    nations: List[str] = field(default_factory=list)
+    etag: Optional[str] = None
+    fetched_at: Optional[float] = None
+
+
+class NationCache:
+    """Cached lists of the nations dispatches and RMB posts can be published as
+
+    The lists are refreshed every `Caches.nations_interval` seconds with
+    conditional requests, so an unchanged list costs an empty 304. Until a
+    list is first fetched, `get` starts fetching it and waits at most
+    `COLD_WAIT` seconds for it, after that it always returns the cached list
+    immediately.
+    """
+
+    _client: EurocoreClient
+    _config: Caches
+    _lists: Dict[str, NationList]
+    _locks: Dict[str, asyncio.Lock]
+    _loading: Dict[str, asyncio.Task]
+
+    def __init__(self, client: EurocoreClient, config: Caches):
+        self._client = client
+        self._config = config
+        self._lists = {collection: NationList() for collection in NATION_HEADERS}
+        self._locks = {collection: asyncio.Lock() for collection in NATION_HEADERS}
+        self._loading = {}
+
+    async def refresh(self, collection: str):
+        async with self._locks[collection]:
+            cached = self._lists[collection]
+
+            nations, etag = await self._client.nations(collection, cached.etag)
+
+            cached.fetched_at = time.monotonic()
+
+            if nations is None:
+                return
+
+            if nations != cached.nations:
+                logger.info("%s nations: %s", collection, ", ".join(nations))
+
+            cached.nations = nations
+            cached.etag = etag
+
+    async def refresh_all(self):
+        results = await asyncio.gather(
+            *(self.refresh(collection) for collection in self._lists),
+            return_exceptions=True,
+        )
+
+        for collection, result in zip(self._lists, results):
+            if isinstance(result, Exception):
+                logger.error(f"unable to refresh {collection} nations: {result}")
+
+    async def _load(self, collection: str):
+        try:
+            await self.refresh(collection)
+        except Exception as e:
+            logger.error(f"unable to load {collection} nations: {e}")
+
+    async def get(self, collection: str) -> List[str]:
+        """Nations that can publish to `collection`"""
+        cached = self._lists[collection]
+
+        if cached.fetched_at is None:
+            task = self._loading.get(collection)
+
+            if task is None or task.done():
+                task = asyncio.create_task(self._load(collection))
+                self._loading[collection] = task
+
+            # the fetch carries on in the background if it takes longer
+            try:
+                async with asyncio.timeout(COLD_WAIT):
+                    await asyncio.shield(task)
+            except TimeoutError:
+                pass
+
+            if cached.fetched_at is None:
+                raise commands.UserInputError(
+                    "the list of nations is not loaded yet, try again shortly"
+                )
+
+        return cached.nations
@@ -0,0 +1,192 @@
+import aiohttp
+import asyncio
+import logging
+
+from collections import defaultdict
+from typing import Coroutine, Dict, Iterable, List, Set
+
+from components.client import EurocoreClient
+from components.config import Polling
+from components.jobs import Job
+
+logger = logging.getLogger("r4n")
+
+UNSUPPORTED_STATUSES = {404, 405, 501}
+"""Statuses meaning a collection does not support batched requests at all"""
+
+
+class JobPoller:
+    """Updates eurocore jobs concurrently
+
+    Jobs are grouped by the collection their status lives in and fetched
+    `Polling.batch_size` at a time with `GET {collection}?ids=...`. Once a
+    collection answers a batch as unsupported (404, 405 or 501) or with a
+    reply that is not a list of statuses, its jobs are fetched one by one
+    from their own location instead. Jobs missing from a batch reply, and
+    those of a batch that failed for any other reason, are fetched one by
+    one for that pass only.
+
+    At most `Polling.concurrency` requests are in flight at once, each is
+    bounded by `Polling.job_timeout` and the pass as a whole by
+    `Polling.pass_timeout`. Jobs that do not finish in time are left queued
+    and picked up again on the next pass.
+    """
+
+    _client: EurocoreClient
+    _config: Polling
+    _unbatched: Set[str]
+
+    def __init__(self, client: EurocoreClient, config: Polling):
+        self._client = client
+        self._config = config
+        self._unbatched = set()
+
+    async def _update(self, semaphore: asyncio.Semaphore, job: Job):
+        async with semaphore:
+            try:
+                async with asyncio.timeout(self._config.job_timeout):
+                    await job.update(self._client)
+            except TimeoutError:
+                logger.warning("timed out updating job: %s", job.id)
+            except Exception:
+                logger.exception("unable to update job: %s", job.id)
+
+    async def _refresh(self, semaphore: asyncio.Semaphore, job: Job):
+        async with semaphore:
+            try:
+                async with asyncio.timeout(self._config.job_timeout):
+                    await job.refresh()
+            except TimeoutError:
+                logger.warning("timed out refreshing job: %s", job.id)
+            except Exception:
+                logger.exception("unable to refresh job: %s", job.id)
+
+    async def _unbatch(
+        self, semaphore: asyncio.Semaphore, collection: str, jobs: List[Job]
+    ):
+        """Stop batching `collection` and fetch its jobs one by one"""
+        self._unbatched.add(collection)
+
+        await self._update_each(semaphore, jobs)
+
+    async def _update_each(self, semaphore: asyncio.Semaphore, jobs: List[Job]):
+        await asyncio.gather(*(self._update(semaphore, job) for job in jobs))
+
+    async def _update_batch(
+        self, semaphore: asyncio.Semaphore, collection: str, jobs: List[Job]
+    ):
+        try:
+            async with semaphore:
+                async with asyncio.timeout(self._config.job_timeout):
+                    data = await self._client.job_statuses(
+                        collection, [job.key for job in jobs]
+                    )
+        except aiohttp.ClientResponseError as e:
+            if e.status in UNSUPPORTED_STATUSES:
+                logger.info(
+                    "batched polling unsupported for: %s (status %d)",
+                    collection,
+                    e.status,
+                )
+
+                await self._unbatch(semaphore, collection, jobs)
+                return
+
+            logger.warning(
+                "batched polling failed for: %s (status %d), fetching jobs one by one",
+                collection,
+                e.status,
+            )
+
+            await self._update_each(semaphore, jobs)
+            return
+        except TimeoutError:
+            logger.warning("timed out updating %d jobs in: %s", len(jobs), collection)
+            return
+        except Exception:
+            logger.exception("unable to update jobs in: %s", collection)
+            return
+
+        if not isinstance(data, list) or not all(
+            isinstance(item, dict) and "id" in item for item in data
+        ):
+            logger.info("batched polling unsupported for: %s (bad reply)", collection)
+
+            await self._unbatch(semaphore, collection, jobs)
+            return
+
+        statuses = {str(item["id"]): item for item in data}
+
+        updated = []
+        missing = []
+
+        for job in jobs:
+            if job.key not in statuses:
+                missing.append(job)
+                continue
+
+            try:
+                job.apply(statuses[job.key])
+            except Exception:
+                logger.exception("unable to update job: %s", job.id)
+                continue
+
+            updated.append(job)
+
+        if missing:
+            logger.debug(
+                "%d jobs missing from batch of: %s, fetching them one by one",
+                len(missing),
+                collection,
+            )
+
+        await asyncio.gather(
+            *(self._refresh(semaphore, job) for job in updated),
+            *(self._update(semaphore, job) for job in missing),
+        )
+
+    def _plan(
+        self, semaphore: asyncio.Semaphore, jobs: Iterable[Job]
+    ) -> List[Coroutine]:
+        collections: Dict[str, List[Job]] = defaultdict(list)
+
+        for job in jobs:
+            collections[job.collection].append(job)
+
+        work = []
+
+        for collection, group in collections.items():
+            if collection in self._unbatched or len(group) == 1:
+                work.extend(self._update(semaphore, job) for job in group)
+                continue
+
+            for i in range(0, len(group), self._config.batch_size):
+                chunk = group[i : i + self._config.batch_size]
+                work.append(self._update_batch(semaphore, collection, chunk))
+
+        return work
+
+    async def poll(self, jobs: Iterable[Job]):
+        """Update `jobs` and edit their messages"""
+        semaphore = asyncio.Semaphore(self._config.concurrency)
+
+        tasks = [
+            asyncio.create_task(coroutine) for coroutine in self._plan(semaphore, jobs)
+        ]
+
+        if not tasks:
+            return
+
+        _, pending = await asyncio.wait(tasks, timeout=self._config.pass_timeout)
+
+        for task in pending:
+            task.cancel()
+
+        if pending:
+            await asyncio.wait(pending)
+
+            logger.warning(
+                "polling pass timed out, %d of %d requests not completed",
+                len(pending),
+                len(tasks),
+            )
@@ -0,0 +1,87 @@
+import heapq
+import random
+import time
+
+from typing import Dict, List, Optional, Tuple
+
+from components.config import Polling
+
+
+class JobScheduler:
+    """Due-time heap for eurocore jobs
+
+    Each job is first polled `Polling.initial_interval` seconds after it is
+    added, every following poll is pushed back by `Polling.backoff` up to
+    `Polling.max_interval`, with `Polling.jitter` applied so jobs submitted
+    together spread out. Rescheduled and removed jobs leave stale heap
+    entries behind, which are discarded when they surface.
+    """
+
+    _config: Polling
+    _heap: List[Tuple[float, int, str]]
+    _entries: Dict[str, Tuple[float, int]]
+    _sequence: int
+
+    def __init__(self, config: Polling):
+        self._config = config
+        self._heap = []
+        self._entries = {}
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._entries
+
+    def _interval(self, attempts: int) -> float:
+        interval = min(
+            self._config.initial_interval * self._config.backoff**attempts,
+            self._config.max_interval,
+        )
+
+        return interval * random.uniform(1 - self._config.jitter, 1)
+
+    def _push(self, job_id: str, due: float, attempts: int):
+        self._sequence += 1
+        self._entries[job_id] = (due, attempts)
+
+        heapq.heappush(self._heap, (due, self._sequence, job_id))
+
+    def add(self, job_id: str, now: Optional[float] = None):
+        """Schedule the first poll of `job_id`"""
+        now = time.monotonic() if now is None else now
+
+        self._push(job_id, now + self._interval(0), 0)
+
+    def reschedule(self, job_id: str, now: Optional[float] = None):
+        """Schedule the next poll of `job_id`, backing off from the last one"""
+        now = time.monotonic() if now is None else now
+
+        _, attempts = self._entries.get(job_id, (now, 0))
+        attempts += 1
+
+        self._push(job_id, now + self._interval(attempts), attempts)
+
+    def remove(self, job_id: str):
+        self._entries.pop(job_id, None)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Pop every job id whose poll is due
+
+        Popped jobs stay known to the scheduler and must be passed to
+        `reschedule` or `remove` once they have been polled.
+        """
+        now = time.monotonic() if now is None else now
+
+        job_ids = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due, _, job_id = heapq.heappop(self._heap)
+
+            entry = self._entries.get(job_id)
+
+            if entry and entry[0] == due:
+                job_ids.append(job_id)
+
+        return job_ids
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+import sqlite3
+
+from cryptography.fernet import Fernet, InvalidToken
+from datetime import datetime
+from typing import List, Optional
+
+from components.config import Database
+from components.user import User
+
+logger = logging.getLogger("r4n")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    discord_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+)
+"""
+
+
+class SessionStore:
+    """Encrypted store of eurocore sessions, keyed by Discord id
+
+    Each user's name, token and token expiry is encrypted with
+    `Database.session_key` before it is written, so the database alone is
+    not enough to act as them. Passwords are never stored, so restored users
+    have to log in again once their token expires. Sessions that cannot be
+    decrypted, e.g. with the wrong key, are skipped on load and kept.
+    """
+
+    _config: Database
+    _fernet: Fernet
+    _connection: Optional[sqlite3.Connection]
+    _lock: asyncio.Lock
+
+    def __init__(self, config: Database):
+        self._config = config
+        self._fernet = Fernet(config.session_key)
+        self._connection = None
+        self._lock = asyncio.Lock()
+
+    def _open(self):
+        self._connection = sqlite3.connect(
+            self._config.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(SCHEMA)
+
+    async def open(self):
+        await asyncio.to_thread(self._open)
+
+    async def close(self):
+        async with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    def _encrypt(self, user: User) -> bytes:
+        return self._fernet.encrypt(
+            json.dumps(
+                {
+                    "name": user.name,
+                    "token": user.token,
+                    "expires_at": user.expires_at.isoformat(),
+                }
+            ).encode()
+        )
+
+    def _decrypt(self, discord_id: int, data: bytes) -> User:
+        session = json.loads(self._fernet.decrypt(data))
+
+        user = User(discord_id, session["name"], password="", token=session["token"])
+
+        # sessions saved before expiries were stored carry their login time
+        if "expires_at" in session:
+            user.token_expires_at = datetime.fromisoformat(session["expires_at"])
+        else:
+            user.last_login = datetime.fromisoformat(session["last_login"])
+
+        return user
+
+    async def save(self, user: User):
+        data = self._encrypt(user)
+
+        async with self._lock:
+            if not self._connection:
+                return
+
+            await asyncio.to_thread(
+                self._connection.execute,
+                "INSERT OR REPLACE INTO sessions (discord_id, data) VALUES (?, ?)",
+                (user.id, data),
+            )
+
+    async def delete(self, discord_id: int):
+        async with self._lock:
+            if not self._connection:
+                return
+
+            await asyncio.to_thread(
+                self._connection.execute,
+                "DELETE FROM sessions WHERE discord_id = ?",
+                (discord_id,),
+            )
+
+    def _load(self) -> List[User]:
+        users = []
+
+        for discord_id, data in self._connection.execute(
+            "SELECT discord_id, data FROM sessions"
+        ).fetchall():
+            try:
+                users.append(self._decrypt(discord_id, data))
+            except (InvalidToken, ValueError, KeyError):
+                logger.warning("skipping unreadable session: %d", discord_id)
+
+        # rewrite sessions saved by earlier versions, which kept the password
+        self._connection.executemany(
+            "UPDATE sessions SET data = ? WHERE discord_id = ?",
+            [(self._encrypt(user), user.id) for user in users],
+        )
+
+        return users
+
+    async def load(self) -> List[User]:
+        """Stored sessions"""
+        async with self._lock:
+            return await asyncio.to_thread(self._load)
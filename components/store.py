@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import sqlite3
+import time
+
+from typing import Dict, List, Optional, Tuple
+
+from components.config import Database
+from components.jobs import Job
+
+logger = logging.getLogger("r4n")
+
+COLUMNS = (
+    "id",
+    "kind",
+    "job_id",
+    "action",
+    "location",
+    "user_id",
+    "user_name",
+    "guild_id",
+    "channel_id",
+    "message_id",
+    "ping",
+    "created_at",
+    "modified_at",
+    "status",
+    "owner",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    action TEXT,
+    location TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    user_name TEXT NOT NULL,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    message_id INTEGER,
+    ping INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    modified_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT
+)
+"""
+
+LEASES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    instance_id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+)
+"""
+
+# columns added after the first release, added to existing databases on open
+ADDED_COLUMNS = {"guild_id": "guild_id INTEGER", "owner": "owner TEXT"}
+
+# jobs taken over by another instance are left alone
+UPSERT = f"""
+INSERT INTO jobs ({", ".join(COLUMNS)})
+VALUES ({", ".join(f":{column}" for column in COLUMNS)})
+ON CONFLICT (id) DO UPDATE SET
+{", ".join(f"{column} = excluded.{column}" for column in COLUMNS[1:])}
+WHERE jobs.owner IS NULL OR jobs.owner = excluded.owner
+"""
+
+DELETE = "DELETE FROM jobs WHERE id = ? AND (owner IS NULL OR owner = ?)"
+
+RENEW = """
+INSERT INTO leases (instance_id, expires_at) VALUES (?, ?)
+ON CONFLICT (instance_id) DO UPDATE SET expires_at = excluded.expires_at
+"""
+
+
+class JobStore:
+    """SQLite backed store of queued eurocore jobs
+
+    `save` and `delete` only buffer the change, buffered changes are written
+    in a single transaction every `Database.flush_interval` seconds and when
+    the store is closed. Only the latest change to each job is written.
+
+    Several instances can share the store, each job is owned by the instance
+    that saved it. Instances hold a lease renewed with `renew`, jobs of an
+    instance whose lease has expired are taken over by the next instance to
+    renew its own.
+    """
+
+    _config: Database
+    _connection: Optional[sqlite3.Connection]
+    _pending: Dict[str, Optional[dict]]
+    _lock: asyncio.Lock
+    _flusher: Optional[asyncio.Task]
+
+    def __init__(self, config: Database):
+        self._config = config
+        self._connection = None
+        self._pending = {}
+        self._lock = asyncio.Lock()
+        self._flusher = None
+
+    def _open(self):
+        self._connection = sqlite3.connect(
+            self._config.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(SCHEMA)
+        self._connection.execute(LEASES_SCHEMA)
+
+        columns = {
+            row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")
+        }
+
+        for column, definition in ADDED_COLUMNS.items():
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {definition}")
+
+    async def open(self):
+        await asyncio.to_thread(self._open)
+
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+
+        await self.flush()
+
+        if self._connection:
+            try:
+                await asyncio.to_thread(self._release)
+            except sqlite3.Error:
+                logger.exception("unable to release lease")
+
+            self._connection.close()
+            self._connection = None
+
+    def save(self, job: Job):
+        self._pending[job.id] = job.to_record()
+
+    def delete(self, job_id: str):
+        self._pending[job_id] = None
+
+    def _write(self, changes: Dict[str, Optional[dict]]):
+        owner = self._config.instance_id
+        upserts = [
+            {**{column: record.get(column) for column in COLUMNS}, "owner": owner}
+            for record in changes.values()
+            if record is not None
+        ]
+        deletes = [
+            (job_id, owner) for job_id, record in changes.items() if record is None
+        ]
+
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(UPSERT, upserts)
+            self._connection.executemany(DELETE, deletes)
+
+    async def _flush(self):
+        """Write the buffered changes, the caller must hold the lock"""
+        if not self._pending or not self._connection:
+            return
+
+        changes, self._pending = self._pending, {}
+
+        try:
+            await asyncio.to_thread(self._write, changes)
+        except sqlite3.Error:
+            logger.exception("unable to write %d job changes", len(changes))
+
+            # keep the changes for the next flush, unless superseded
+            self._pending = {**changes, **self._pending}
+            return
+
+        logger.debug("wrote %d job changes", len(changes))
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self._config.flush_interval)
+            await self.flush()
+
+    def _renew(self) -> Tuple[List[dict], List[str]]:
+        instance_id = self._config.instance_id
+        now = time.time()
+
+        with self._connection:
+            # take the write lock up front, so only one instance claims a job
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute(RENEW, (instance_id, now + self._config.lease_ttl))
+
+            live = {
+                row["instance_id"]
+                for row in self._connection.execute(
+                    "SELECT instance_id FROM leases WHERE expires_at > ?", (now,)
+                )
+            }
+            records = [
+                dict(row) for row in self._connection.execute("SELECT * FROM jobs")
+            ]
+
+            claimed = [record for record in records if record["owner"] not in live]
+
+            self._connection.executemany(
+                "UPDATE jobs SET owner = ? WHERE id = ?",
+                [(instance_id, record["id"]) for record in claimed],
+            )
+            self._connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+        for record in claimed:
+            if record["owner"] is not None:
+                logger.info("took over job %s from %s", record["id"], record["owner"])
+
+            record["owner"] = instance_id
+
+        owned = [record for record in records if record["owner"] == instance_id]
+        lost = [record["id"] for record in records if record["owner"] != instance_id]
+
+        return owned, lost
+
+    async def renew(self) -> Tuple[List[dict], List[str]]:
+        """Renew this instance's lease and take over jobs of expired ones
+
+        Returns the records of every job owned by this instance, and the ids
+        of jobs owned by other instances.
+        """
+        async with self._lock:
+            # finished jobs must be deleted before they are read back
+            await self._flush()
+
+            owned, lost = await asyncio.to_thread(self._renew)
+
+        # jobs deleted while renewing, or whose delete failed to be written
+        owned = [
+            record
+            for record in owned
+            if not (
+                record["id"] in self._pending and self._pending[record["id"]] is None
+            )
+        ]
+
+        return owned, lost
+
+    def _release(self):
+        self._connection.execute(
+            "DELETE FROM leases WHERE instance_id = ?", (self._config.instance_id,)
+        )
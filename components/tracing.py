@@ -0,0 +1,162 @@
+import aiohttp
+import logging
+import time
+
+from types import SimpleNamespace
+from typing import Optional
+from yarl import URL
+
+from components.config import Requests
+from components.metrics import Counter, Histogram, Registry
+
+logger = logging.getLogger("r4n")
+
+PHASES = ("queued", "dns", "connect", "first_byte", "total")
+
+
+class RequestTracer:
+    """Times the phases of every request made through a `ClientSession`
+
+    Records how long each request waited for a free connection, resolved
+    its host, connected (including DNS and TLS) and waited for the response
+    headers after sending its own, and whether it reused a pooled
+    connection. Requests slower than `Requests.slow_threshold` seconds are
+    logged with their phases.
+    """
+
+    _config: Requests
+
+    phases: Histogram
+    connections: Counter
+    exceptions: Counter
+
+    def __init__(self, config: Requests):
+        self._config = config
+
+        self.phases = Histogram(
+            "r4n_http_request_phase_seconds",
+            "Duration of outgoing HTTP request phases, by host",
+            ("host", "phase"),
+        )
+        self.connections = Counter(
+            "r4n_http_connections_total",
+            "Connections used by outgoing HTTP requests, new or reused, by host",
+            ("host", "kind"),
+        )
+        self.exceptions = Counter(
+            "r4n_http_request_exceptions_total",
+            "Outgoing HTTP requests that failed without a response, by host",
+            ("host",),
+        )
+
+    def register(self, registry: Registry):
+        registry.register(self.phases)
+        registry.register(self.connections)
+        registry.register(self.exceptions)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._start("queued"))
+        trace_config.on_connection_queued_end.append(self._end("queued"))
+        trace_config.on_dns_resolvehost_start.append(self._start("dns"))
+        trace_config.on_dns_resolvehost_end.append(self._end("dns"))
+        trace_config.on_connection_create_start.append(self._start("connect"))
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_request_headers_sent.append(self._start("first_byte"))
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+
+        return trace_config
+
+    def _start(self, phase: str):
+        async def on_start(session, context: SimpleNamespace, params):
+            context.started[phase] = time.monotonic()
+
+        return on_start
+
+    def _end(self, phase: str):
+        async def on_end(session, context: SimpleNamespace, params):
+            self._finish(context, phase)
+
+        return on_end
+
+    def _finish(self, context: SimpleNamespace, phase: str):
+        started = context.started.pop(phase, None)
+
+        if started is not None:
+            context.timings[phase] = time.monotonic() - started
+
+    async def _on_request_start(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestStartParams,
+    ):
+        context.host = params.url.host or ""
+        context.started = {"total": time.monotonic()}
+        context.timings = {}
+        context.reused = False
+
+    async def _on_connection_create_end(self, session, context, params):
+        self._finish(context, "connect")
+        self.connections.inc(host=context.host, kind="new")
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        context.reused = True
+        self.connections.inc(host=context.host, kind="reused")
+
+    async def _on_request_end(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ):
+        self._complete(context, params.method, params.url, params.response.status)
+
+    async def _on_request_exception(
+        self,
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestExceptionParams,
+    ):
+        # with raise_for_status, error statuses end the request as an exception
+        if isinstance(params.exception, aiohttp.ClientResponseError):
+            status = params.exception.status
+        else:
+            status = None
+            self.exceptions.inc(host=context.host)
+
+        self._complete(context, params.method, params.url, status)
+
+    def _complete(
+        self, context: SimpleNamespace, method: str, url: URL, status: Optional[int]
+    ):
+        self._finish(context, "first_byte")
+        self._finish(context, "total")
+
+        for phase, elapsed in context.timings.items():
+            self.phases.observe(elapsed, host=context.host, phase=phase)
+
+        total = context.timings["total"]
+
+        if total < self._config.slow_threshold:
+            return
+
+        phases = ", ".join(
+            f"{phase} {context.timings[phase]:.3f}s"
+            for phase in PHASES
+            if phase in context.timings and phase != "total"
+        )
+
+        logger.warning(
+            "slow request: %s %s %s took %.3fs (%s, %s connection)",
+            method,
+            url.with_query(None),
+            status if status is not None else "failed",
+            total,
+            phases or "no phases recorded",
+            "reused" if context.reused else "new",
+        )
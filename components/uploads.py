@@ -0,0 +1,72 @@
+import aiohttp
+import codecs
+import discord
+import json
+
+from discord.ext import commands
+from typing import AsyncIterator
+
+from components.client import Body
+
+CHUNK_SIZE = 64 * 1024
+
+
+def escape(text: str) -> str:
+    """`text` as the inside of a JSON string"""
+    return json.dumps(text)[1:-1]
+
+
+def attachment_body(
+    session: aiohttp.ClientSession,
+    attachment: discord.Attachment,
+    data: dict,
+    field: str,
+    limit: int,
+) -> Body:
+    """JSON body of `data` with `field` set to the text of `attachment`
+
+    The attachment is streamed from Discord in chunks and decoded as it
+    arrives, so it is never held in memory whole. Attachments over `limit`
+    bytes are rejected before anything is downloaded, and the limit is
+    enforced again while streaming in case the reported size is wrong.
+    """
+    if attachment.size > limit:
+        raise commands.UserInputError(f"attachment must be at most {limit} bytes")
+
+    fields = json.dumps(data)[:-1]
+    head = f'{fields}{", " if data else ""}{json.dumps(field)}: "'
+
+    async def body() -> AsyncIterator[bytes]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        size = 0
+
+        yield head.encode()
+
+        try:
+            async with session.get(attachment.url) as response:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    size += len(chunk)
+
+                    if size > limit:
+                        raise commands.UserInputError(
+                            f"attachment must be at most {limit} bytes"
+                        )
+
+                    yield escape(decoder.decode(chunk)).encode()
+
+            yield f'{escape(decoder.decode(b"", final=True))}"}}'.encode()
+        except UnicodeDecodeError:
+            raise commands.UserInputError("attachment must be UTF-8 text")
+
+    return body
+
+
+async def attachment_text(attachment: discord.Attachment, limit: int) -> str:
+    """Text of `attachment`, for content that is sent more than once"""
+    if attachment.size > limit:
+        raise commands.UserInputError(f"attachment must be at most {limit} bytes")
+
+    try:
+        return (await attachment.read()).decode("UTF-8")
+    except UnicodeDecodeError:
+        raise commands.UserInputError("attachment must be UTF-8 text")
@@ -1,6 +1,26 @@
-from datetime import datetime
+import base64
+import binascii
+import json
+
+from datetime import datetime, timedelta
 from typing import Optional
 
+# assumed lifetime of tokens that do not carry an expiry
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+def token_expiry(token: str) -> Optional[datetime]:
+    """Expiry of a JWT, read from its `exp` claim without verifying it"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+
+        return datetime.fromtimestamp(int(claims["exp"]))
+    except (IndexError, KeyError, TypeError, ValueError, binascii.Error):
+        return None
+
 
 class User:
     id: int
@@ -8,6 +28,7 @@ class User:
     password: str
     token: Optional[str]
     last_login: datetime
+    token_expires_at: Optional[datetime]
 
     def __init__(self, id: int, name: str, password: str, token: Optional[str] = None):
         self.id = id
@@ -15,6 +36,7 @@ class User:
         self.password = password
         self.token = token
         self.last_login = datetime.now()
+        self.token_expires_at = token_expiry(token) if token else None
 
     def __repr__(self):
         return f"User(name={self.name}, last_login={self.last_login})"
@@ -22,8 +44,19 @@ class User:
     def __eq__(self, other):
         return self.name == other.name
 
+    @property
+    def expires_at(self) -> datetime:
+        """When the user's token expires"""
+        return self.token_expires_at or self.last_login + TOKEN_LIFETIME
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now() >= self.expires_at
+
     def add_token(self, token: str):
         self.token = token
+        self.last_login = datetime.now()
+        self.token_expires_at = token_expiry(token)
 
 
 class UserList:
@@ -56,3 +89,6 @@ class UserList:
         self.users[discord_id] = user
 
         return self.users[discord_id]
+
+    def remove_user(self, discord_id: int):
+        self.users.pop(discord_id, None)
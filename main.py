@@ -1,17 +1,34 @@
-import aiohttp
-import asyncio
+import time
 
-from components.bot import Bot
-from components.config import Config
+STARTED_AT = time.monotonic()
+
+import aiohttp  # noqa: E402
+import asyncio  # noqa: E402
+import sys  # noqa: E402
+
+from components.bot import Bot, ShardedBot  # noqa: E402
+from components.config import Config  # noqa: E402
+from components.tracing import RequestTracer  # noqa: E402
 
 
 async def main():
     config = Config()
 
-    async with aiohttp.ClientSession(raise_for_status=True) as client:
-        async with Bot(config, client) as bot:
+    bot_type = ShardedBot if config.sharding.enabled else Bot
+
+    tracer = RequestTracer(config.requests)
+
+    async with aiohttp.ClientSession(
+        raise_for_status=True, trace_configs=[tracer.trace_config()]
+    ) as client:
+        async with bot_type(config, client, STARTED_AT) as bot:
+            tracer.register(bot.metrics)
+
             await bot.start(config.discord_token)
 
+    if config.startup.benchmark and not bot.within_budget:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from aiohttp.test_utils import unused_port
+from datetime import datetime, timezone
+
+from components.bot import Bot
+from components.config import Config, Events
+from components.events import JobEventReceiver
+from components.jobs import Dispatch
+from components.user import User
+from tools.fake_eurocore import timestamp
+
+
+def status(**fields) -> dict:
+    return {
+        "id": 1,
+        "status": "success",
+        "error": None,
+        "created_at": timestamp(),
+        "modified_at": timestamp(),
+        "dispatch_id": 1,
+        **fields,
+    }
+
+
+async def post(monkeypatch, tmp_path, event) -> tuple[int, Dispatch]:
+    monkeypatch.setenv("HOST_USER", "test")
+    monkeypatch.setenv("DISCORD_TOKEN", "test")
+    monkeypatch.setenv("EUROCORE_URL", "http://eurocore.invalid")
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "r4n.db"))
+
+    async with aiohttp.ClientSession() as session:
+        bot = Bot(Config(), session)
+
+        now = datetime.now(timezone.utc)
+        job = Dispatch(
+            1,
+            "add",
+            User(1, "testlandia", "hunter2"),
+            "/queue/dispatches/1",
+            now,
+            now,
+            "queued",
+        )
+        bot.add_job(job)
+
+        port = unused_port()
+        receiver = JobEventReceiver(Events(port=port), bot.handle_job_event)
+        await receiver.start()
+
+        try:
+            async with session.post(
+                f"http://127.0.0.1:{port}/events", json=event
+            ) as response:
+                return response.status, job
+        finally:
+            await receiver.stop()
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        {"type": "dispatch", "job": "1"},
+        {"type": "dispatch", "job": [status()]},
+        {"type": "dispatch", "job": {"id": 1}},
+        {"type": "dispatch", "job": status(status=None)},
+        {"type": "dispatch", "job": status(modified_at="yesterday")},
+        {
+            "type": "dispatch",
+            "job": {k: v for k, v in status().items() if k != "dispatch_id"},
+        },
+        {"type": ["dispatch"], "job": status()},
+    ],
+)
+def test_malformed_events_are_rejected(monkeypatch, tmp_path, event):
+    code, job = asyncio.run(post(monkeypatch, tmp_path, event))
+
+    assert code == 400
+    assert job.status == "queued"
+
+
+def test_events_update_known_jobs(monkeypatch, tmp_path):
+    code, job = asyncio.run(
+        post(monkeypatch, tmp_path, {"type": "dispatch", "job": status()})
+    )
+
+    assert code == 204
+    assert job.status == "success"
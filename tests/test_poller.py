@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from datetime import datetime, timezone
+
+from components.client import EurocoreClient
+from components.config import Polling, Requests
+from components.jobs import Dispatch
+from components.poller import JobPoller
+from components.user import User
+from tools.fake_eurocore import FakeEurocore, timestamp
+
+JOBS = 3
+BATCHED = "GET /queue/{kind}"
+SINGLE = "GET /queue/{kind}/{id}"
+
+
+def queued_jobs(eurocore: FakeEurocore) -> list[Dispatch]:
+    user = User(1, "testlandia", "hunter2")
+    now = datetime.now(timezone.utc)
+    jobs = []
+
+    for job_id in range(1, JOBS + 1):
+        eurocore.jobs["dispatches"][str(job_id)] = {
+            "id": job_id,
+            "status": "success",
+            "error": None,
+            "created_at": timestamp(),
+            "modified_at": timestamp(),
+            "dispatch_id": job_id,
+        }
+
+        jobs.append(
+            Dispatch(
+                job_id, "add", user, f"/queue/dispatches/{job_id}", now, now, "queued"
+            )
+        )
+
+    return jobs
+
+
+async def poll_twice(eurocore: FakeEurocore, *middlewares) -> list[Dispatch]:
+    app = eurocore.app()
+    app.middlewares.extend(middlewares)
+
+    async with TestServer(app) as server:
+        async with aiohttp.ClientSession(raise_for_status=True) as session:
+            client = EurocoreClient(
+                session, str(server.make_url("")).rstrip("/"), Requests(retries=0)
+            )
+            poller = JobPoller(client, Polling())
+            jobs = queued_jobs(eurocore)
+
+            await poller.poll(jobs)
+            await poller.poll(jobs)
+
+            return jobs
+
+
+def test_unavailable_batch_falls_back_for_one_pass():
+    eurocore = FakeEurocore(delay=30, batching=True, token_lifetime=3600)
+    failed = False
+
+    @web.middleware
+    async def fail_once(request: web.Request, handler):
+        nonlocal failed
+
+        if request.path == "/queue/dispatches" and not failed:
+            failed = True
+            raise web.HTTPServiceUnavailable()
+
+        return await handler(request)
+
+    jobs = asyncio.run(poll_twice(eurocore, fail_once))
+
+    assert all(job.status == "success" for job in jobs)
+    assert eurocore.requests[BATCHED] == 2
+    assert eurocore.requests[SINGLE] == JOBS
+
+
+def test_unsupported_batch_stops_batching():
+    eurocore = FakeEurocore(delay=30, batching=False, token_lifetime=3600)
+
+    jobs = asyncio.run(poll_twice(eurocore))
+
+    assert all(job.status == "success" for job in jobs)
+    assert eurocore.requests[BATCHED] == 1
+    assert eurocore.requests[SINGLE] == 2 * JOBS
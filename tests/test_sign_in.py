@@ -0,0 +1,53 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from aiohttp.test_utils import TestServer
+
+from components.bot import Bot
+from components.config import Config
+from components.user import User
+from tools.fake_eurocore import FakeEurocore
+
+CALLERS = 20
+
+
+@pytest.fixture
+def eurocore() -> FakeEurocore:
+    return FakeEurocore(delay=30, batching=True, token_lifetime=3600)
+
+
+async def run(monkeypatch, tmp_path, eurocore: FakeEurocore, callback):
+    async with TestServer(eurocore.app()) as server:
+        monkeypatch.setenv("HOST_USER", "test")
+        monkeypatch.setenv("DISCORD_TOKEN", "test")
+        monkeypatch.setenv("EUROCORE_URL", str(server.make_url("")))
+        monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "r4n.db"))
+
+        async with aiohttp.ClientSession(raise_for_status=True) as client:
+            return await callback(Bot(Config(), client))
+
+
+def test_concurrent_sign_ins_log_in_once(monkeypatch, tmp_path, eurocore):
+    user = User(1, "testlandia", "hunter2")
+
+    async def sign_in(bot: Bot):
+        await asyncio.gather(*(bot.sign_in(user) for _ in range(CALLERS)))
+
+    asyncio.run(run(monkeypatch, tmp_path, eurocore, sign_in))
+
+    assert eurocore.requests["POST /login"] == 1
+    assert user.token is not None
+
+
+def test_concurrent_registrations_register_once(monkeypatch, tmp_path, eurocore):
+    async def register(bot: Bot):
+        return await asyncio.gather(
+            *(bot.register(1, "testlandia", "hunter2") for _ in range(CALLERS))
+        )
+
+    users = asyncio.run(run(monkeypatch, tmp_path, eurocore, register))
+
+    assert eurocore.requests["POST /register"] == 1
+    assert all(user is users[0] for user in users)
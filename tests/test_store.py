@@ -0,0 +1,74 @@
+import asyncio
+
+from datetime import datetime, timezone
+
+from components.config import Database
+from components.jobs import Dispatch
+from components.store import JobStore
+from components.user import User
+
+LEASE_TTL = 0.2
+
+
+def store(tmp_path, instance_id: str) -> JobStore:
+    return JobStore(
+        Database(
+            path=str(tmp_path / "r4n.db"),
+            flush_interval=60,
+            instance_id=instance_id,
+            lease_ttl=LEASE_TTL,
+        )
+    )
+
+
+def dispatch(status: str = "queued") -> Dispatch:
+    now = datetime.now(timezone.utc)
+
+    return Dispatch(
+        1,
+        "add",
+        User(1, "testlandia", "hunter2"),
+        "/queue/dispatches/1",
+        now,
+        now,
+        status,
+    )
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    async def run():
+        first, second = store(tmp_path, "first"), store(tmp_path, "second")
+        await first.open()
+        await second.open()
+
+        try:
+            await first.renew()
+            first.save(dispatch())
+            await first.flush()
+
+            # the first instance's lease is live, its job stays its own
+            owned, lost = await second.renew()
+            assert owned == [] and lost == ["dispatch-1"]
+
+            await asyncio.sleep(LEASE_TTL * 2)
+
+            owned, lost = await second.renew()
+            assert [record["id"] for record in owned] == ["dispatch-1"]
+            assert lost == []
+
+            # the first instance finds it lost the job, and can no longer change it
+            owned, lost = await first.renew()
+            assert owned == [] and lost == ["dispatch-1"]
+
+            first.save(dispatch("success"))
+            await first.flush()
+            first.delete("dispatch-1")
+            await first.flush()
+
+            owned, _ = await second.renew()
+            assert [record["status"] for record in owned] == ["queued"]
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(run())
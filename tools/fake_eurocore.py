@@ -0,0 +1,259 @@
+"""Local stand-in for the eurocore API
+
+Implements just enough of eurocore for r4n to run against it during
+development: accounts, dispatch and RMB post submission, and job status
+lookups, both one at a time and batched. Queued jobs succeed after
+`--delay` seconds, and with `--webhook` each completion is also published
+to r4n as a job event.
+
+    uv run tools/fake_eurocore.py --port 8000
+    EUROCORE_URL=http://localhost:8000 uv run main.py
+"""
+
+import aiohttp
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import time
+
+from aiohttp import web
+from collections import Counter
+from datetime import datetime, timezone
+
+logger = logging.getLogger("fake_eurocore")
+
+NATIONS = "testlandia,upc"
+
+EVENT_TYPES = {"dispatches": "dispatch", "rmbposts": "rmbpost"}
+
+
+def timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def token(username: str, lifetime: int) -> str:
+    def encode(value: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+    header = encode({"alg": "none", "typ": "JWT"})
+    claims = encode({"sub": username, "exp": int(time.time()) + lifetime})
+
+    return f"{header}.{claims}."
+
+
+class FakeEurocore:
+    def __init__(
+        self,
+        delay: float,
+        batching: bool,
+        token_lifetime: int,
+        webhook: str | None = None,
+        secret: str | None = None,
+    ):
+        self.delay = delay
+        self.batching = batching
+        self.token_lifetime = token_lifetime
+        self.webhook = webhook
+        self.secret = secret
+        self.session = None
+        self.published = set()
+        self.users = {}
+        self.jobs = {"dispatches": {}, "rmbposts": {}}
+        self.ids = itertools.count(1)
+        self.requests = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.count])
+        app.cleanup_ctx.append(self.publisher)
+
+        app.add_routes(
+            [
+                web.post("/register", self.register),
+                web.post("/login", self.login),
+                web.get("/users/username/{username}", self.user),
+                web.head("/dispatches", self.nations("dispatch-nations")),
+                web.head("/rmbposts", self.nations("rmbpost-nations")),
+                web.post("/dispatches", self.submit("dispatches", "add")),
+                web.put("/dispatches/{id}", self.submit("dispatches", "edit")),
+                web.delete("/dispatches/{id}", self.submit("dispatches", "remove")),
+                web.post("/rmbposts", self.submit("rmbposts", None)),
+                web.get("/queue/{kind}", self.statuses),
+                web.get("/queue/{kind}/{id}", self.status),
+                web.get("/stats", self.stats),
+            ]
+        )
+
+        return app
+
+    async def publisher(self, _: web.Application):
+        self.session = aiohttp.ClientSession() if self.webhook else None
+
+        yield
+
+        if self.session:
+            await self.session.close()
+
+    async def publish(self, kind: str, job: dict):
+        headers = {"Authorization": f"Bearer {self.secret}"} if self.secret else {}
+        event = {"type": EVENT_TYPES[kind], "job": job}
+
+        try:
+            async with self.session.post(
+                self.webhook, json=event, headers=headers
+            ) as response:
+                logger.info("published %s event: %d", event["type"], response.status)
+        except aiohttp.ClientError as e:
+            logger.warning("unable to publish %s event: %s", event["type"], e)
+
+    def complete(self, kind: str, job: dict):
+        job["status"] = "success"
+        job["modified_at"] = timestamp()
+        job["dispatch_id" if kind == "dispatches" else "rmbpost_id"] = job["id"]
+
+        if self.session:
+            task = asyncio.create_task(self.publish(kind, dict(job)))
+            self.published.add(task)
+            task.add_done_callback(self.published.discard)
+
+    @web.middleware
+    async def count(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        self.requests[
+            f"{request.method} {route.canonical if route else request.path}"
+        ] += 1
+
+        return await handler(request)
+
+    async def register(self, request: web.Request) -> web.Response:
+        data = await request.json()
+
+        if data["username"] in self.users:
+            raise web.HTTPConflict()
+
+        self.users[data["username"]] = data["password"]
+
+        return web.json_response(
+            {"token": token(data["username"], self.token_lifetime)}
+        )
+
+    async def login(self, request: web.Request) -> web.Response:
+        data = await request.json()
+
+        if (
+            self.users.setdefault(data["username"], data["password"])
+            != data["password"]
+        ):
+            raise web.HTTPUnauthorized()
+
+        return web.json_response(
+            {"token": token(data["username"], self.token_lifetime)}
+        )
+
+    async def user(self, request: web.Request) -> web.Response:
+        username = request.match_info["username"]
+
+        if username not in self.users:
+            raise web.HTTPNotFound()
+
+        return web.json_response(
+            {"id": list(self.users).index(username) + 1, "username": username}
+        )
+
+    def nations(self, header: str):
+        etag = f'"{hashlib.sha1(NATIONS.encode()).hexdigest()}"'
+
+        async def handler(request: web.Request) -> web.Response:
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+
+            return web.Response(headers={header: NATIONS, "ETag": etag})
+
+        return handler
+
+    def submit(self, kind: str, action: str | None):
+        async def handler(request: web.Request) -> web.Response:
+            if not request.headers.get("Authorization", "").startswith("Bearer "):
+                raise web.HTTPUnauthorized()
+
+            await request.read()
+
+            job_id = next(self.ids)
+            now = timestamp()
+
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "error": None,
+                "created_at": now,
+                "modified_at": now,
+                "dispatch_id" if kind == "dispatches" else "rmbpost_id": None,
+            }
+
+            if action:
+                job["action"] = action
+
+            self.jobs[kind][str(job_id)] = job
+
+            asyncio.get_running_loop().call_later(self.delay, self.complete, kind, job)
+
+            return web.json_response(
+                job,
+                status=202,
+                headers={"Location": f"/queue/{kind}/{job_id}"},
+            )
+
+        return handler
+
+    async def status(self, request: web.Request) -> web.Response:
+        jobs = self.jobs.get(request.match_info["kind"], {})
+
+        if (job := jobs.get(request.match_info["id"])) is None:
+            raise web.HTTPNotFound()
+
+        return web.json_response(job)
+
+    async def statuses(self, request: web.Request) -> web.Response:
+        if not self.batching:
+            raise web.HTTPNotFound()
+
+        jobs = self.jobs.get(request.match_info["kind"], {})
+        ids = request.query.get("ids", "").split(",")
+
+        return web.json_response([jobs[job_id] for job_id in ids if job_id in jobs])
+
+    async def stats(self, _: web.Request) -> web.Response:
+        return web.json_response(dict(self.requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--delay", type=float, default=30, help="seconds until queued jobs succeed"
+    )
+    parser.add_argument(
+        "--no-batch", action="store_true", help="reject batched job status requests"
+    )
+    parser.add_argument(
+        "--token-lifetime", type=int, default=3600, help="seconds tokens are valid for"
+    )
+    parser.add_argument("--webhook", help="URL to publish job events to")
+    parser.add_argument("--secret", help="bearer token to publish job events with")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    eurocore = FakeEurocore(
+        args.delay, not args.no_batch, args.token_lifetime, args.webhook, args.secret
+    )
+
+    web.run_app(eurocore.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
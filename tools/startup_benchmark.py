@@ -0,0 +1,86 @@
+"""Measure how long r4n takes from process start to on_ready
+
+Runs main.py `--runs` times in benchmark mode, where the bot shuts down as
+soon as it is ready and exits non-zero if startup took longer than
+`--budget` seconds. Needs the same environment as a normal run, e.g. a
+real DISCORD_TOKEN and EUROCORE_URL pointing at tools/fake_eurocore.py.
+
+    uv run tools/startup_benchmark.py --budget 5 --runs 3
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+READY = re.compile(r"ready in (\d+\.\d+)s")
+
+
+def run(budget: float, timeout: float) -> float | None:
+    env = {**os.environ, "STARTUP_BENCHMARK": "1", "STARTUP_BUDGET": str(budget)}
+
+    try:
+        result = subprocess.run(
+            [sys.executable, "main.py"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        print(f"timed out after {timeout:.0f}s")
+        return None
+
+    match = READY.search(result.stderr)
+
+    if not match:
+        print(result.stderr[-2000:], end="")
+        print(f"exited with {result.returncode} before becoming ready")
+        return None
+
+    startup = float(match.group(1))
+
+    if result.returncode != 0:
+        print(f"ready in {startup:.2f}s, over budget")
+        return None
+
+    print(f"ready in {startup:.2f}s")
+
+    return startup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget", type=float, default=5, help="seconds allowed until on_ready"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="seconds allowed for each run"
+    )
+    args = parser.parse_args()
+
+    times = []
+
+    for _ in range(args.runs):
+        startup = run(args.budget, args.timeout)
+
+        if startup is None:
+            sys.exit(1)
+
+        times.append(startup)
+
+    print(
+        f"min {min(times):.2f}s, median {statistics.median(times):.2f}s, "
+        f"max {max(times):.2f}s, budget {args.budget:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()